@@ -1,19 +1,51 @@
 # app/main.py
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
-from app.infrastructures.database.connection import engine
-from app.infrastructures.database.models import Base
+from app.config import settings
+from app.infrastructures.database.connection import dispose_engines, read_engine
+from app.infrastructures.database.migrations import check_schema_version
+from app.infrastructures.database.profiler import enable_profiler
 from app.presentation.controllers.book_controller import router as book_router
+from app.presentation.controllers.metrics_controller import router as metrics_router
 from app.presentation.controllers.user_controller import router as user_router
+from app.presentation.middleware import MetricsMiddleware, QueryProfilerMiddleware
+
+
+def configure_logging() -> None:
+    # Only the application's loggers; the root level would also turn on SQLAlchemy's statement logging
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.log_level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Only checks the version: the schema is created and upgraded by `python -m app.cli migrate`
+    async with read_engine.connect() as connection:
+        await connection.run_sync(check_schema_version)
+    yield
+    await dispose_engines()
 
 
 def create_app() -> FastAPI:
+    configure_logging()
     app = FastAPI(
         title="Library Management System API",
         description="API for managing books and users in a library system",
         version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Enable CORS
@@ -25,12 +57,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],  # Allow all headers
     )
 
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    if settings.sql_profiler_enabled:
+        enable_profiler(slow_query_seconds=settings.sql_slow_query_ms / 1000)
+        app.add_middleware(
+            QueryProfilerMiddleware,
+            repeated_statement_threshold=settings.sql_repeated_statement_threshold,
+            expose_headers=settings.debug,
+        )
+
+    # Added last so it is outermost and times the whole request
+    app.add_middleware(MetricsMiddleware)
 
     # Include routers
     app.include_router(book_router)
     app.include_router(user_router)
+    app.include_router(metrics_router)
 
     return app
 
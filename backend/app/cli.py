@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from app.infrastructures.catalog_io import CatalogFormat, read_records
+from app.infrastructures.database.connection import AsyncSessionLocal, dispose_engines, engine
+from app.infrastructures.database.migrations import LATEST_VERSION, SchemaVersionError, check_schema_version, migrate
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.usecase.catalog import IMPORT_CHUNK_SIZE, CatalogUseCase
+
+
+async def _import_books(path: Path, file_format: CatalogFormat, chunk_size: int) -> int:
+    async with AsyncSessionLocal() as session:
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            report = await CatalogUseCase(UnitOfWork(session)).import_books(
+                read_records(stream, file_format), chunk_size=chunk_size
+            )
+    await dispose_engines()
+
+    for error in report.errors:
+        print(f"line {error.line}: {error.message}")
+    print(f"Imported {report.imported} books, {report.failed} rows failed")
+    return 1 if report.failed else 0
+
+
+def _migrate() -> int:
+    applied = migrate(engine)
+    for description in applied:
+        print(f"Applied: {description}")
+    print(f"Database schema is at version {LATEST_VERSION}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Library system maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("migrate", help="Create or upgrade the database schema")
+
+    import_parser = subparsers.add_parser("import-books", help="Bulk import books from a CSV or JSONL file")
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument("--format", choices=[f.value for f in CatalogFormat], help="Defaults to the extension")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per transaction")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        return _migrate()
+    if args.command == "import-books":
+        file_format = CatalogFormat(args.format) if args.format else CatalogFormat.from_filename(args.path.name)
+        if file_format is None:
+            parser.error("cannot infer the file format, pass --format")
+        try:
+            with engine.connect() as connection:
+                check_schema_version(connection)
+        except SchemaVersionError as error:
+            parser.exit(1, f"{error}\n")
+        return asyncio.run(_import_books(args.path, file_format, args.chunk_size))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
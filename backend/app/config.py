@@ -0,0 +1,83 @@
+from collections.abc import Mapping
+from enum import Enum
+import os
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class SqliteProfile(Enum):
+    # SQLite's own defaults: rollback journal and a full fsync on every commit
+    DEFAULT = "default"
+    # WAL so readers no longer wait for writers, still fsyncing every commit
+    DURABLE = "durable"
+    # WAL with synchronous=NORMAL plus larger page cache and mmap; a power loss may drop
+    # the last commits but never corrupts the database
+    FAST = "fast"
+
+
+# Environment variable for each setting
+_ENVIRONMENT = {
+    "database_url": "DATABASE_URL",
+    "sqlite_profile": "SQLITE_PROFILE",
+    "read_pool_size": "DATABASE_READ_POOL_SIZE",
+    "repository_cache_enabled": "REPOSITORY_CACHE",
+    "repository_cache_size": "REPOSITORY_CACHE_SIZE",
+    "repository_cache_ttl_seconds": "REPOSITORY_CACHE_TTL_SECONDS",
+    "response_cache_enabled": "RESPONSE_CACHE",
+    "response_cache_size": "RESPONSE_CACHE_SIZE",
+    "token_cache_size": "TOKEN_CACHE_SIZE",
+    "event_queue_size": "EVENT_QUEUE_SIZE",
+    "event_heartbeat_seconds": "EVENT_HEARTBEAT_SECONDS",
+    "password_hash_time_cost": "PASSWORD_HASH_TIME_COST",
+    "password_hash_memory_cost": "PASSWORD_HASH_MEMORY_COST",
+    "password_hash_workers": "PASSWORD_HASH_WORKERS",
+    "log_level": "LOG_LEVEL",
+    "debug": "DEBUG",
+    "sql_profiler_enabled": "SQL_PROFILER",
+    "sql_slow_query_ms": "SQL_SLOW_QUERY_MS",
+    "sql_repeated_statement_threshold": "SQL_REPEATED_STATEMENT_THRESHOLD",
+}
+
+
+class Settings(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    database_url: str = "sqlite:///repository.db"
+    sqlite_profile: SqliteProfile = SqliteProfile.FAST
+    read_pool_size: int = Field(default=8, ge=1)
+    repository_cache_enabled: bool = True
+    repository_cache_size: int = Field(default=10000, ge=1)
+    repository_cache_ttl_seconds: float = Field(default=60, gt=0)
+    response_cache_enabled: bool = True
+    response_cache_size: int = Field(default=1000, ge=1)
+    token_cache_size: int = Field(default=10000, ge=1)
+    # Events buffered per subscriber of the book event feed before it is dropped
+    event_queue_size: int = Field(default=100, ge=1)
+    # Idle feeds send a comment this often, which also detects clients that went away
+    event_heartbeat_seconds: float = Field(default=15, gt=0)
+    # Argon2id cost: iterations and memory in KiB (defaults follow the OWASP minimum of 2 and 19 MiB)
+    password_hash_time_cost: int = Field(default=2, ge=1)
+    password_hash_memory_cost: int = Field(default=19456, ge=8)
+    password_hash_workers: int = Field(default=4, ge=1)
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    # Debug mode adds diagnostics, such as the SQL profile of a request, to responses
+    debug: bool = False
+    sql_profiler_enabled: bool = False
+    sql_slow_query_ms: float = Field(default=100, ge=0)
+    sql_repeated_statement_threshold: int = Field(default=5, ge=2)
+
+    @field_validator("database_url")
+    @classmethod
+    def validate_database_url(cls, value: str) -> str:
+        # Upserts and full-text search rely on SQLite-specific SQL
+        if not value.startswith("sqlite"):
+            raise ValueError("Only SQLite database URLs are supported")
+        return value
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "Settings":
+        return cls.model_validate({field: environ[name] for field, name in _ENVIRONMENT.items() if name in environ})
+
+
+settings = Settings.from_env()
@@ -46,19 +46,9 @@ class Book(BaseModel):
     category: list[Category]
     status: BookStatus = BookStatus.AVAILABLE
     borrowed_by: UserId | None = None
+    # Increases on every write to the book; assigned by the repository
+    version: int = 1
 
     @property
     def is_available(self) -> bool:
         return self.status == BookStatus.AVAILABLE
-
-    def borrow(self, user_id: UserId) -> None:
-        if not self.is_available:
-            raise ValueError("Book is not available for borrowing")
-        self.status = BookStatus.BORROWED
-        self.borrowed_by = user_id
-
-    def return_book(self) -> None:
-        if self.status != BookStatus.BORROWED:
-            raise ValueError("Book is not borrowed")
-        self.status = BookStatus.AVAILABLE
-        self.borrowed_by = None
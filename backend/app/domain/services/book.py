@@ -1,21 +1,147 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from enum import Enum
+from typing import TypedDict
 
-from app.domain.models.book import Book, Id
+from pydantic import BaseModel, ConfigDict
+
+from app.domain.models.book import Book, BookStatus, Category, Id
+from app.domain.models.user import Id as UserId
 
 
 class IBookRepository(ABC):
     @abstractmethod
-    def find_by_id(self, book_id: Id) -> Book | None:
+    async def find_by_id(self, book_id: Id) -> Book | None:
+        pass
+
+    @abstractmethod
+    async def find_version(self, book_id: Id) -> int | None:
+        """Return the current version of a book without loading it, or None if it does not exist."""
+
+    @abstractmethod
+    async def find_all(self) -> list[Book]:
+        pass
+
+    @abstractmethod
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[Book]:
+        """Iterate over every book, fetching `batch_size` rows at a time instead of loading them all."""
+
+    @abstractmethod
+    async def find_ids_by_borrower(self, user_id: UserId) -> list[Id]:
+        pass
+
+    @abstractmethod
+    async def save(self, book: Book) -> None:
+        """Insert a new book, or update the details of an existing one.
+
+        The loan of an existing book, its `status` and `borrowed_by`, is never written: the saved copy
+        may be stale, so loans only change through the `mark_*` methods.
+        """
+
+    @abstractmethod
+    async def insert_new(self, books: list[Book]) -> list[Id]:
+        """Insert the books whose id is not taken yet, leaving existing books untouched. Return the ids inserted."""
+
+    @abstractmethod
+    async def mark_borrowed(self, book_id: Id, user_id: UserId) -> Book | None:
+        """Atomically lend an available book to `user_id`. Return None if it was missing or not available."""
+
+    @abstractmethod
+    async def mark_returned(self, book_id: Id, borrower_id: UserId | None = None) -> Book | None:
+        """Atomically return a borrowed book, only if held by `borrower_id` when given. Return None otherwise."""
+
+    @abstractmethod
+    async def mark_many_borrowed(self, book_ids: list[Id], user_id: UserId) -> list[Book]:
+        """Lend every available book among `book_ids` to `user_id` at once and return the books lent."""
+
+    @abstractmethod
+    async def mark_many_returned(self, book_ids: list[Id], borrower_id: UserId | None = None) -> list[Book]:
+        """Return every book among `book_ids` that `mark_returned` would return and return those books."""
+
+    @abstractmethod
+    async def delete(self, book_id: Id) -> None:
+        pass
+
+
+class BookRow(TypedDict):
+    """Read-only projection of a book, already shaped like its API representation."""
+
+    title: str
+    author: str
+    description: str | None
+    category: str
+    id: str
+    status: str
+    borrowed_by_id: str | None
+
+
+class BookFilter(BaseModel):
+    """Conditions a listed book must meet; unset fields do not filter."""
+
+    model_config = ConfigDict(frozen=True)
+
+    # Case-insensitive substring of the title
+    title: str | None = None
+    author: str | None = None
+    # Books having this category among their categories
+    category: Category | None = None
+    status: BookStatus | None = None
+
+
+class IBookQueryService(ABC):
+    """Read side for listings: returns projected rows instead of hydrating `Book` entities."""
+
+    @abstractmethod
+    async def find_page(self, offset: int, limit: int, filters: BookFilter) -> list[BookRow]:
         pass
 
     @abstractmethod
-    def find_all(self) -> list[Book]:
+    async def find_after(self, limit: int, after: tuple[str, str] | None, filters: BookFilter) -> list[BookRow]:
+        """Return up to `limit` books ordered by (title, id) that sort strictly after `after`."""
+
+    @abstractmethod
+    async def count(self, filters: BookFilter) -> int:
         pass
 
     @abstractmethod
-    def save(self, book: Book) -> None:
+    async def count_by_category(self, filters: BookFilter) -> dict[str, int]:
+        """Count the books matching `filters` in each category; a book counts once for each of its categories."""
+
+    @abstractmethod
+    async def count_by_status(self, filters: BookFilter) -> dict[str, int]:
         pass
 
     @abstractmethod
-    def delete(self, book_id: Id) -> None:
+    async def search(self, query: str, offset: int, limit: int) -> list[BookRow]:
+        """Return books matching a full-text query over title, author and description, best match first."""
+
+    @abstractmethod
+    async def count_search(self, query: str) -> int:
         pass
+
+    @abstractmethod
+    async def catalog_version(self) -> int:
+        """Return a counter that increases on every write to any book."""
+
+
+class BookEventType(Enum):
+    BORROWED = "borrowed"
+    RETURNED = "returned"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class BookEvent(BaseModel):
+    """A committed change to a book; `book` is its new state, None once deleted."""
+
+    model_config = ConfigDict(frozen=True)
+
+    type: BookEventType
+    book_id: Id
+    book: Book | None = None
+
+
+class IBookEventPublisher(ABC):
+    @abstractmethod
+    def publish(self, event: BookEvent) -> None:
+        """Hand `event` to the current subscribers without waiting for them. Call once the change is committed."""
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+
+class IPasswordHasher(ABC):
+    @abstractmethod
+    async def hash(self, password: str) -> str:
+        pass
+
+    @abstractmethod
+    async def verify(self, password: str, password_hash: str | None) -> tuple[bool, str | None]:
+        """Check `password` against a stored hash.
+
+        Return whether it matches and, when the stored hash uses outdated parameters, a new hash to store.
+        Without a stored hash the check fails, but takes as long as a real one.
+        """
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Self
+
+from app.domain.services.book import IBookRepository
+from app.domain.services.user import IUserRepository
+
+
+class IUnitOfWork(ABC):
+    """Groups repository changes so they are written and committed in one transaction."""
+
+    books: IBookRepository
+    users: IUserRepository
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        # Anything not explicitly committed is discarded
+        await self.rollback()
+
+    @abstractmethod
+    async def commit(self) -> None:
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        pass
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+import time
+from typing import Generic, TypeVar
+
+from app.domain.models.book import (
+    Book,
+    Id as BookId,
+)
+from app.domain.models.user import (
+    Email,
+    Id as UserId,
+    User,
+)
+from app.domain.services.book import IBookRepository
+from app.domain.services.user import IUserRepository
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries also expire `ttl` seconds after being stored.
+
+    Not thread-safe: it is meant to be shared by coroutines on a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        # Loads in flight per key: how many, and how often the key was invalidated since they started
+        self._loads: dict[K, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store `value`; a `ttl` shorter than the default makes the entry expire earlier."""
+        self._entries[key] = (self.clock() + (self.ttl if ttl is None else min(ttl, self.ttl)), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[V | None]]) -> V | None:
+        """Return the cached value, or load and store it.
+
+        A load that was in flight while the key was invalidated may have read the old value, so its
+        result is returned but not stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        loads, generation = self._loads.get(key, (0, 0))
+        self._loads[key] = (loads + 1, generation)
+        try:
+            value = await load()
+        finally:
+            loads, current = self._loads.pop(key)
+            if loads > 1:
+                self._loads[key] = (loads - 1, current)
+        if value is not None and current == generation:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+        if key in self._loads:
+            loads, generation = self._loads[key]
+            self._loads[key] = (loads, generation + 1)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for key, (loads, generation) in self._loads.items():
+            self._loads[key] = (loads, generation + 1)
+
+
+class CachedBookRepository(IBookRepository):
+    """Read-through cache for `find_by_id`; every write through this repository evicts the book.
+
+    Entities are mutable, so callers always receive a copy of the cached book. Writes made
+    through a unit of work are evicted by the unit of work once they are committed.
+    """
+
+    def __init__(self, repository: IBookRepository, cache: TTLCache[str, Book]) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    async def find_by_id(self, book_id: BookId) -> Book | None:
+        book = await self.cache.get_or_load(book_id.value, lambda: self.repository.find_by_id(book_id))
+        return book.model_copy(deep=True) if book else None
+
+    async def find_version(self, book_id: BookId) -> int | None:
+        book = self.cache.get(book_id.value)
+        if book is None:
+            return await self.repository.find_version(book_id)
+        return book.version
+
+    async def find_all(self) -> list[Book]:
+        return await self.repository.find_all()
+
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[Book]:
+        return self.repository.stream_all(batch_size)
+
+    async def find_ids_by_borrower(self, user_id: UserId) -> list[BookId]:
+        return await self.repository.find_ids_by_borrower(user_id)
+
+    # Writes evict after the underlying call, once the new row is stored; a read that loaded the
+    # old row meanwhile does not cache it, see `TTLCache.get_or_load`
+
+    async def save(self, book: Book) -> None:
+        await self.repository.save(book)
+        self.cache.invalidate(book.id.value)
+
+    async def insert_new(self, books: list[Book]) -> list[BookId]:
+        # Only books that were not stored, hence not cached, are written
+        return await self.repository.insert_new(books)
+
+    async def mark_borrowed(self, book_id: BookId, user_id: UserId) -> Book | None:
+        book = await self.repository.mark_borrowed(book_id, user_id)
+        self.cache.invalidate(book_id.value)
+        return book
+
+    async def mark_returned(self, book_id: BookId, borrower_id: UserId | None = None) -> Book | None:
+        book = await self.repository.mark_returned(book_id, borrower_id)
+        self.cache.invalidate(book_id.value)
+        return book
+
+    async def mark_many_borrowed(self, book_ids: list[BookId], user_id: UserId) -> list[Book]:
+        books = await self.repository.mark_many_borrowed(book_ids, user_id)
+        for book_id in book_ids:
+            self.cache.invalidate(book_id.value)
+        return books
+
+    async def mark_many_returned(self, book_ids: list[BookId], borrower_id: UserId | None = None) -> list[Book]:
+        books = await self.repository.mark_many_returned(book_ids, borrower_id)
+        for book_id in book_ids:
+            self.cache.invalidate(book_id.value)
+        return books
+
+    async def delete(self, book_id: BookId) -> None:
+        await self.repository.delete(book_id)
+        self.cache.invalidate(book_id.value)
+
+
+class CachedUserRepository(IUserRepository):
+    """Read-through cache for `find_by_id`. Lookups by email always hit the database."""
+
+    def __init__(self, repository: IUserRepository, cache: TTLCache[str, User]) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    async def find_by_id(self, user_id: UserId) -> User | None:
+        user = await self.cache.get_or_load(user_id.value, lambda: self.repository.find_by_id(user_id))
+        return user.model_copy(deep=True) if user else None
+
+    async def find_by_email(self, email: Email) -> User | None:
+        return await self.repository.find_by_email(email)
+
+    async def find_all(self) -> list[User]:
+        return await self.repository.find_all()
+
+    async def save(self, user: User) -> None:
+        await self.repository.save(user)
+        self.cache.invalidate(user.id.value)
+
+    async def delete(self, user_id: UserId) -> None:
+        await self.repository.delete(user_id)
+        self.cache.invalidate(user_id.value)
@@ -0,0 +1,64 @@
+from collections.abc import Iterable, Iterator
+import csv
+from enum import Enum
+import io
+import json
+from typing import Any, TextIO
+
+# Exported columns; an export can be imported into another catalog, where books whose id exists are skipped
+EXPORT_FIELDS = ("id", "title", "author", "description", "category", "status", "borrowed_by_id")
+
+
+class CatalogFormat(Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+    @property
+    def media_type(self) -> str:
+        return "text/csv" if self is CatalogFormat.CSV else "application/x-ndjson"
+
+    @classmethod
+    def from_filename(cls, filename: str | None) -> "CatalogFormat | None":
+        extension = (filename or "").rsplit(".", 1)[-1].lower()
+        if extension in {"jsonl", "ndjson"}:
+            return cls.JSONL
+        if extension == "csv":
+            return cls.CSV
+        return None
+
+
+def read_records(stream: TextIO, file_format: CatalogFormat) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """Lazily yield (line number, record) pairs; the record is None when the line cannot be parsed."""
+    if file_format is CatalogFormat.CSV:
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def format_header(file_format: CatalogFormat) -> str:
+    if file_format is CatalogFormat.JSONL:
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+
+def format_records(records: Iterable[dict[str, Any]], file_format: CatalogFormat) -> str:
+    """Serialize a batch of records as CSV rows or JSON lines, without a header."""
+    if file_format is CatalogFormat.JSONL:
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writerows(records)
+    return buffer.getvalue()
@@ -1,6 +1,15 @@
 #!/usr/bin/env python
-from .connection import SessionLocal
-from .database import BookRepository
+from .connection import AsyncSessionLocal, ReadSessionLocal, SessionLocal
+from .database import BookQueryService, BookRepository
 from .models import BookModel
+from .unit_of_work import UnitOfWork
 
-__all__ = ["BookModel", "BookRepository", "SessionLocal"]
+__all__ = [
+    "AsyncSessionLocal",
+    "BookModel",
+    "BookQueryService",
+    "BookRepository",
+    "ReadSessionLocal",
+    "SessionLocal",
+    "UnitOfWork",
+]
@@ -1,9 +1,76 @@
 #!/usr/bin/env python
-from sqlalchemy import create_engine
+from typing import Any
+
+from sqlalchemy import AsyncAdaptedQueuePool, Engine, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///repository.db"
+from app.config import SqliteProfile, settings
+
+# Pragmas applied to every new connection. Benchmarks for each profile are in backend/benchmarks
+SQLITE_PRAGMAS: dict[SqliteProfile, dict[str, str | int]] = {
+    SqliteProfile.DEFAULT: {},
+    SqliteProfile.DURABLE: {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    SqliteProfile.FAST: {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        # Negative sizes are in KiB: 64 MiB of page cache per connection
+        "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024,
+    },
+}
+
+
+def configure_sqlite(engine: Engine, profile: SqliteProfile) -> None:
+    pragmas = SQLITE_PRAGMAS[profile]
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+_url = make_url(settings.database_url)
+DATABASE_URL = _url.set(drivername="sqlite")
+ASYNC_DATABASE_URL = _url.set(drivername="sqlite+aiosqlite")
 
 
+# Synchronous engine for schema management and offline tooling
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Request handling goes through async engines so database I/O does not block the event loop.
+# aiosqlite defaults to NullPool; pooling keeps the pragmas and page cache of each connection.
+# SQLite allows a single writer, so mutations share one connection and queue for it instead of
+# failing on the database lock, while reads spread over a pool of read-only connections
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+read_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, pool_size=settings.read_pool_size, max_overflow=0
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(bind=read_engine, autoflush=False, expire_on_commit=False)
+
+configure_sqlite(engine, settings.sqlite_profile)
+configure_sqlite(async_engine.sync_engine, settings.sqlite_profile)
+configure_sqlite(read_engine.sync_engine, settings.sqlite_profile)
+
+
+@event.listens_for(read_engine.sync_engine, "connect")
+def _make_read_only(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+async def dispose_engines() -> None:
+    # Pooled aiosqlite connections each keep a worker thread alive until they are closed
+    await async_engine.dispose()
+    await read_engine.dispose()
@@ -1,123 +1,425 @@
 #!/usr/bin/env python
-from sqlalchemy.orm import Session
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, cast
+
+from sqlalchemy import Select, delete, func, literal, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.util import identity_key
 
 from app.domain.models.book import (
-    Author,
     Book,
     BookStatus,
     Category,
-    Description,
     Id as BookId,
-    Title,
 )
 from app.domain.models.user import (
     Email,
     Id as UserId,
-    Name,
-    Password,
     User,
 )
-from app.domain.services.book import IBookRepository
+from app.domain.services.book import BookFilter, BookRow, IBookQueryService, IBookRepository
 from app.domain.services.user import IUserRepository
 
-from .connection import SessionLocal
-from .models import BookModel, UserModel
+from .connection import AsyncSessionLocal
+from .models import BookCategoryModel, BookModel, CatalogVersionModel, UserModel
+from .search import books_fts, index_books, match, to_match_query, unindex_books
+
+
+def _upsert(model: type[BookModel | UserModel], columns: Iterable[str]) -> Any:
+    statement = insert(model)
+    return statement.on_conflict_do_update(
+        index_elements=[model.id],
+        set_={column: statement.excluded[column] for column in columns},
+    )
+
+
+def _evict(session: AsyncSession, model: type[BookModel | UserModel], ids: Iterable[str]) -> None:
+    # Bulk statements bypass the identity map, so drop stale copies of the rows they touched
+    for entity_id in ids:
+        record = session.identity_map.get(identity_key(model, entity_id))
+        if record is not None:
+            session.expunge(record)
+
+
+def _filter(query: Select[Any], filters: BookFilter) -> Select[Any]:
+    if filters.title:
+        # Escape LIKE wildcards so the filter stays a plain case-insensitive substring match
+        pattern = filters.title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(BookModel.title.ilike(f"%{pattern}%", escape="\\"))
+    if filters.author:
+        query = query.where(BookModel.author == filters.author)
+    if filters.status:
+        query = query.where(BookModel.status == filters.status.value)
+    if filters.category:
+        query = query.where(
+            BookModel.id.in_(
+                select(BookCategoryModel.book_id).where(BookCategoryModel.category == filters.category.value)
+            )
+        )
+    return query
+
+
+# Columns of a `BookRow` in BookResponse field order. `category` is already the joined list of
+# categories, and an empty description means none
+_BOOK_ROW = select(
+    BookModel.title,
+    BookModel.author,
+    func.nullif(BookModel.description, "").label("description"),
+    BookModel.category,
+    BookModel.id,
+    BookModel.status,
+    BookModel.borrowed_by_id,
+)
+
+# Saving an existing book leaves its loan alone. The saved copy may be stale, and only the mark_*
+# compare-and-set statements may change status and borrowed_by_id
+_BOOK_UPSERT = _upsert(BookModel, ["title", "author", "description", "category", "version"])
+_BOOK_INSERT_NEW = insert(BookModel).on_conflict_do_nothing(index_elements=[BookModel.id]).returning(BookModel.id)
+_USER_UPSERT = _upsert(UserModel, ["name", "email", "password", "is_admin"])
+_NEXT_CATALOG_VERSION = (
+    update(CatalogVersionModel).values(version=CatalogVersionModel.version + 1).returning(CatalogVersionModel.version)
+)
 
 
 class BookRepository(IBookRepository):
-    def __init__(self, session: Session | None = None) -> None:
-        self.session = session or SessionLocal()
+    """Book persistence.
+
+    With `autocommit=False` the repository is part of a unit of work: saves and deletes are
+    collected and only written by `flush_pending`, and nothing is committed here.
+    """
 
-    def find_by_id(self, book_id: BookId) -> Book | None:
-        book = self.session.query(BookModel).filter(BookModel.id == book_id.value).first()
+    def __init__(self, session: AsyncSession | None = None, *, autocommit: bool = True) -> None:
+        self.session = session or AsyncSessionLocal()
+        self.autocommit = autocommit
+        self._pending_saves: dict[str, Book] = {}
+        self._pending_deletes: set[str] = set()
+        # Ids of books written through this repository, so callers can react once they commit
+        self.written_ids: set[str] = set()
+
+    async def find_by_id(self, book_id: BookId) -> Book | None:
+        book = await self.session.scalar(select(BookModel).where(BookModel.id == book_id.value))
         return self._to_domain(book) if book else None
 
-    def find_all(self) -> list[Book]:
-        books = self.session.query(BookModel).all()
+    async def find_version(self, book_id: BookId) -> int | None:
+        version: int | None = await self.session.scalar(select(BookModel.version).where(BookModel.id == book_id.value))
+        return version
+
+    async def find_all(self) -> list[Book]:
+        books = await self.session.scalars(select(BookModel))
         return [self._to_domain(b) for b in books]
 
-    def save(self, book: Book) -> None:
-        existing = self.session.query(BookModel).filter(BookModel.id == book.id.value).first()
-        if existing:
-            existing.title = book.title.value
-            existing.author = book.author.value
-            existing.description = book.description.value if book.description else ""
-            existing.category = book.category[0].value if book.category else Category.OTHER.value
-            existing.status = book.status.value
-            existing.borrowed_by_id = str(book.borrowed_by.value) if book.borrowed_by else None  # type: ignore[assignment]
-        else:
-            new_record = BookModel(
-                id=book.id.value,
-                title=book.title.value,
-                author=book.author.value,
-                description=book.description.value if book.description else "",
-                category=book.category[0].value if book.category else Category.OTHER.value,
-                status=book.status.value,
-                borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[Book]:
+        # Server-side cursor: rows are buffered `batch_size` at a time rather than all at once
+        records = await self.session.stream_scalars(select(BookModel).execution_options(yield_per=batch_size))
+        async for record in records:
+            yield self._to_domain(record)
+
+    async def find_ids_by_borrower(self, user_id: UserId) -> list[BookId]:
+        book_ids = await self.session.scalars(select(BookModel.id).where(BookModel.borrowed_by_id == user_id.value))
+        return [BookId(value=book_id) for book_id in book_ids]
+
+    async def save(self, book: Book) -> None:
+        self._pending_deletes.discard(book.id.value)
+        self._pending_saves[book.id.value] = book
+        if self.autocommit:
+            await self.flush_pending()
+            await self.session.commit()
+
+    async def insert_new(self, books: list[Book]) -> list[BookId]:
+        # Written at once rather than collected like saves, since the caller needs the ids inserted
+        if not books:
+            return []
+        version = await self._next_version()
+        for book in books:
+            book.version = version
+        inserted = set(await self.session.scalars(_BOOK_INSERT_NEW, [self._to_row(book) for book in books]))
+        # Only the first of several books with the same id can have been inserted
+        new_books = {book.id.value: book for book in reversed(books) if book.id.value in inserted}
+        if new_books:
+            await self._insert_categories(new_books)
+            await index_books(self.session, [self._to_row(book) for book in new_books.values()])
+            self.written_ids.update(new_books)
+        if self.autocommit:
+            await self.session.commit()
+        return [BookId(value=book_id) for book_id in new_books]
+
+    async def mark_borrowed(self, book_id: BookId, user_id: UserId) -> Book | None:
+        # Compare-and-set: the status check and the write are one statement, so concurrent
+        # borrowers cannot both succeed, and RETURNING saves a follow-up SELECT
+        record = await self.session.scalar(
+            update(BookModel)
+            .where(BookModel.id == book_id.value, BookModel.status == BookStatus.AVAILABLE.value)
+            .values(status=BookStatus.BORROWED.value, borrowed_by_id=user_id.value, version=await self._next_version())
+            .returning(BookModel)
+        )
+        if record is None:
+            return None
+        self.written_ids.add(record.id)
+        if self.autocommit:
+            await self.session.commit()
+        return self._to_domain(record)
+
+    async def mark_returned(self, book_id: BookId, borrower_id: UserId | None = None) -> Book | None:
+        statement = update(BookModel).where(
+            BookModel.id == book_id.value, BookModel.status == BookStatus.BORROWED.value
+        )
+        if borrower_id is not None:
+            statement = statement.where(BookModel.borrowed_by_id == borrower_id.value)
+        record = await self.session.scalar(
+            statement.values(
+                status=BookStatus.AVAILABLE.value, borrowed_by_id=None, version=await self._next_version()
+            ).returning(BookModel)
+        )
+        if record is None:
+            return None
+        self.written_ids.add(record.id)
+        if self.autocommit:
+            await self.session.commit()
+        return self._to_domain(record)
+
+    async def mark_many_borrowed(self, book_ids: list[BookId], user_id: UserId) -> list[Book]:
+        # One set-based UPDATE for the whole batch, with the same availability condition as above
+        records = await self.session.scalars(
+            update(BookModel)
+            .where(
+                BookModel.id.in_([book_id.value for book_id in book_ids]),
+                BookModel.status == BookStatus.AVAILABLE.value,
             )
-            self.session.add(new_record)
-        self.session.commit()
+            .values(status=BookStatus.BORROWED.value, borrowed_by_id=user_id.value, version=await self._next_version())
+            .returning(BookModel)
+        )
+        return await self._updated(records.all())
 
-    def delete(self, book_id: BookId) -> None:
-        self.session.query(BookModel).filter(BookModel.id == book_id.value).delete()
-        self.session.commit()
+    async def mark_many_returned(self, book_ids: list[BookId], borrower_id: UserId | None = None) -> list[Book]:
+        statement = update(BookModel).where(
+            BookModel.id.in_([book_id.value for book_id in book_ids]),
+            BookModel.status == BookStatus.BORROWED.value,
+        )
+        if borrower_id is not None:
+            statement = statement.where(BookModel.borrowed_by_id == borrower_id.value)
+        records = await self.session.scalars(
+            statement.values(
+                status=BookStatus.AVAILABLE.value, borrowed_by_id=None, version=await self._next_version()
+            ).returning(BookModel)
+        )
+        return await self._updated(records.all())
+
+    async def _updated(self, records: Iterable[BookModel]) -> list[Book]:
+        books = [self._to_domain(record) for record in records]
+        self.written_ids.update(book.id.value for book in books)
+        if self.autocommit:
+            await self.session.commit()
+        return books
+
+    async def delete(self, book_id: BookId) -> None:
+        self._pending_saves.pop(book_id.value, None)
+        self._pending_deletes.add(book_id.value)
+        if self.autocommit:
+            await self.flush_pending()
+            await self.session.commit()
+
+    async def flush_pending(self) -> None:
+        """Write collected saves as one batched upsert and collected deletes as one DELETE."""
+        if not self._pending_deletes and not self._pending_saves:
+            return
+        version = await self._next_version()
+        if self._pending_deletes:
+            await self.session.execute(
+                delete(BookCategoryModel).where(BookCategoryModel.book_id.in_(self._pending_deletes))
+            )
+            await self.session.execute(delete(BookModel).where(BookModel.id.in_(self._pending_deletes)))
+            await unindex_books(self.session, self._pending_deletes)
+        if self._pending_saves:
+            for book in self._pending_saves.values():
+                book.version = version
+            rows = [self._to_row(book) for book in self._pending_saves.values()]
+            await self.session.execute(_BOOK_UPSERT, rows)
+            await self._replace_categories()
+            await index_books(self.session, rows)
+        _evict(self.session, BookModel, [*self._pending_deletes, *self._pending_saves])
+        self.written_ids.update(self._pending_deletes, self._pending_saves)
+        self.discard_pending()
+
+    def discard_pending(self) -> None:
+        self._pending_saves.clear()
+        self._pending_deletes.clear()
+
+    async def _replace_categories(self) -> None:
+        await self.session.execute(delete(BookCategoryModel).where(BookCategoryModel.book_id.in_(self._pending_saves)))
+        await self._insert_categories(self._pending_saves)
+
+    async def _insert_categories(self, books: dict[str, Book]) -> None:
+        await self.session.execute(
+            insert(BookCategoryModel),
+            [
+                {"book_id": book_id, "category": category.value}
+                for book_id, book in books.items()
+                # Like the category column, a book without categories is filed under Other
+                for category in dict.fromkeys(book.category or [Category.OTHER])
+            ],
+        )
+
+    async def _next_version(self) -> int:
+        # One increment per write statement; every book it writes takes the new catalog version.
+        # The increment is part of the write's transaction, so it is undone along with a rollback
+        return cast("int", await self.session.scalar(_NEXT_CATALOG_VERSION))
+
+    def _to_row(self, book: Book) -> dict[str, Any]:
+        return {
+            "id": book.id.value,
+            "title": book.title.value,
+            "author": book.author.value,
+            "description": book.description.value if book.description else "",
+            "category": ", ".join(category.value for category in dict.fromkeys(book.category)) or Category.OTHER.value,
+            "status": book.status.value,
+            "borrowed_by_id": book.borrowed_by.value if book.borrowed_by else None,
+            "version": book.version,
+        }
 
     def _to_domain(self, record: BookModel) -> Book:
-        borrowed_by = UserId(value=str(record.borrowed_by_id)) if record.borrowed_by_id else None
-        return Book(
-            id=BookId(value=record.id),
-            title=Title(value=record.title),
-            author=Author(value=record.author),
-            description=Description(value=record.description) if record.description else None,
-            category=[Category(record.category)],
-            status=BookStatus(record.status),
-            borrowed_by=borrowed_by,
+        # A single validator call over plain data is cheaper than building each value object separately
+        return Book.model_validate(
+            {
+                "id": {"value": record.id},
+                "title": {"value": record.title},
+                "author": {"value": record.author},
+                "description": {"value": record.description} if record.description else None,
+                "category": record.category.split(", "),
+                "status": record.status,
+                "borrowed_by": {"value": record.borrowed_by_id} if record.borrowed_by_id else None,
+                "version": record.version,
+            }
+        )
+
+
+class BookQueryService(IBookQueryService):
+    """Listing queries that select only the columns of the API representation of a book."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def find_page(self, offset: int, limit: int, filters: BookFilter) -> list[BookRow]:
+        query = _filter(_BOOK_ROW, filters)
+        return await self._fetch(query.order_by(BookModel.title, BookModel.id).offset(offset).limit(limit))
+
+    async def find_after(self, limit: int, after: tuple[str, str] | None, filters: BookFilter) -> list[BookRow]:
+        query = _filter(_BOOK_ROW, filters)
+        if after is not None:
+            # Row-value comparison lets SQLite seek directly into ix_books_title_id
+            query = query.where(tuple_(BookModel.title, BookModel.id) > tuple_(*map(literal, after)))
+        return await self._fetch(query.order_by(BookModel.title, BookModel.id).limit(limit))
+
+    async def count(self, filters: BookFilter) -> int:
+        query = _filter(select(func.count(BookModel.id)), filters)
+        return int(await self.session.scalar(query) or 0)
+
+    async def count_by_category(self, filters: BookFilter) -> dict[str, int]:
+        query = select(BookCategoryModel.category, func.count()).group_by(BookCategoryModel.category)
+        if filters != BookFilter():
+            # Without filters the counts come from ix_book_categories_category_book_id alone
+            query = _filter(query.join(BookModel, BookModel.id == BookCategoryModel.book_id), filters)
+        result = await self.session.execute(query)
+        return dict(result.tuples().all())
+
+    async def count_by_status(self, filters: BookFilter) -> dict[str, int]:
+        query = _filter(select(BookModel.status, func.count()).group_by(BookModel.status), filters)
+        result = await self.session.execute(query)
+        return dict(result.tuples().all())
+
+    async def search(self, query: str, offset: int, limit: int) -> list[BookRow]:
+        match_query = to_match_query(query)
+        if match_query is None:
+            return []
+        return await self._fetch(
+            _BOOK_ROW.join(books_fts, books_fts.c.book_id == BookModel.id)
+            .where(match(match_query))
+            .order_by(books_fts.c.rank)
+            .offset(offset)
+            .limit(limit)
         )
 
+    async def count_search(self, query: str) -> int:
+        match_query = to_match_query(query)
+        if match_query is None:
+            return 0
+        count = await self.session.scalar(select(func.count()).select_from(books_fts).where(match(match_query)))
+        return int(count or 0)
+
+    async def catalog_version(self) -> int:
+        return await self.session.scalar(select(CatalogVersionModel.version)) or 0
+
+    async def _fetch(self, query: Select[Any]) -> list[BookRow]:
+        result = await self.session.execute(query)
+        return cast("list[BookRow]", [dict(row) for row in result.mappings()])
+
 
 class UserRepository(IUserRepository):
-    def __init__(self, session: Session | None = None) -> None:
-        self.session = session or SessionLocal()
+    """User persistence. See `BookRepository` for the meaning of `autocommit=False`."""
 
-    def find_by_id(self, user_id: UserId) -> User | None:
-        user = self.session.query(UserModel).filter(UserModel.id == user_id.value).first()
+    def __init__(self, session: AsyncSession | None = None, *, autocommit: bool = True) -> None:
+        self.session = session or AsyncSessionLocal()
+        self.autocommit = autocommit
+        self._pending_saves: dict[str, User] = {}
+        self._pending_deletes: set[str] = set()
+        self.written_ids: set[str] = set()
+
+    async def find_by_id(self, user_id: UserId) -> User | None:
+        user = await self.session.scalar(select(UserModel).where(UserModel.id == user_id.value))
         return self._to_domain(user) if user else None
 
-    def find_by_email(self, email: Email) -> User | None:
-        user = self.session.query(UserModel).filter(UserModel.email == email.value).first()
+    async def find_by_email(self, email: Email) -> User | None:
+        user = await self.session.scalar(select(UserModel).where(UserModel.email == email.value))
         return self._to_domain(user) if user else None
 
-    def find_all(self) -> list[User]:
-        users = self.session.query(UserModel).all()
+    async def find_all(self) -> list[User]:
+        users = await self.session.scalars(select(UserModel))
         return [self._to_domain(u) for u in users]
 
-    def save(self, user: User) -> None:
-        existing = self.session.query(UserModel).filter(UserModel.id == user.id.value).first()
-        if existing:
-            existing.name = user.name.value
-            existing.email = user.email.value
-            existing.password = user.password.value
-            existing.is_admin = user.is_admin
-        else:
-            new_record = UserModel(
-                id=user.id.value,
-                name=user.name.value,
-                email=user.email.value,
-                password=user.password.value,
-                is_admin=user.is_admin,
-            )
-            self.session.add(new_record)
-        self.session.commit()
+    async def save(self, user: User) -> None:
+        self._pending_deletes.discard(user.id.value)
+        self._pending_saves[user.id.value] = user
+        if self.autocommit:
+            await self.flush_pending()
+            await self.session.commit()
+
+    async def delete(self, user_id: UserId) -> None:
+        self._pending_saves.pop(user_id.value, None)
+        self._pending_deletes.add(user_id.value)
+        if self.autocommit:
+            await self.flush_pending()
+            await self.session.commit()
+
+    async def flush_pending(self) -> None:
+        if self._pending_deletes:
+            await self.session.execute(delete(UserModel).where(UserModel.id.in_(self._pending_deletes)))
+        if self._pending_saves:
+            await self.session.execute(_USER_UPSERT, [self._to_row(user) for user in self._pending_saves.values()])
+        _evict(self.session, UserModel, [*self._pending_deletes, *self._pending_saves])
+        self.written_ids.update(self._pending_deletes, self._pending_saves)
+        self.discard_pending()
+
+    def discard_pending(self) -> None:
+        self._pending_saves.clear()
+        self._pending_deletes.clear()
 
-    def delete(self, user_id: UserId) -> None:
-        self.session.query(UserModel).filter(UserModel.id == user_id.value).delete()
-        self.session.commit()
+    def _to_row(self, user: User) -> dict[str, Any]:
+        return {
+            "id": user.id.value,
+            "name": user.name.value,
+            "email": user.email.value,
+            "password": user.password.value,
+            "is_admin": user.is_admin,
+        }
 
     def _to_domain(self, record: UserModel) -> User:
-        return User(
-            id=UserId(value=record.id),
-            name=Name(value=record.name),
-            email=Email(value=record.email),
-            password=Password(value=record.password),
-            is_admin=record.is_admin,
+        return User.model_validate(
+            {
+                "id": {"value": record.id},
+                "name": {"value": record.name},
+                # Stored emails were validated when saved; the email validator dominates the cost of a row
+                "email": Email.model_construct(value=record.email),
+                "password": {"value": record.password},
+                "is_admin": record.is_admin,
+            }
         )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+from collections.abc import Callable
+import logging
+
+from sqlalchemy import Connection, Engine
+
+from .search import create_books_fts
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def _create_tables(connection: Connection) -> None:
+    # The schema previously created by `Base.metadata.create_all`, so existing databases adopt it as is
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS users ("
+        "id VARCHAR NOT NULL, name VARCHAR NOT NULL, email VARCHAR NOT NULL, password VARCHAR NOT NULL, "
+        "is_admin BOOLEAN NOT NULL, PRIMARY KEY (id), UNIQUE (email))"
+    )
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS books ("
+        "id VARCHAR NOT NULL, title VARCHAR NOT NULL, author VARCHAR NOT NULL, description TEXT, "
+        "category VARCHAR NOT NULL, status VARCHAR NOT NULL, borrowed_by_id VARCHAR, PRIMARY KEY (id), "
+        "FOREIGN KEY(borrowed_by_id) REFERENCES users (id))"
+    )
+
+
+def _create_book_indexes(connection: Connection) -> None:
+    # `create_all` never added indexes to tables that already existed
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_books_title_id ON books (title, id)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_books_borrowed_by_id_id ON books (borrowed_by_id, id)")
+    connection.exec_driver_sql("ANALYZE books")
+
+
+def _add_book_versions(connection: Connection) -> None:
+    columns = {row.name for row in connection.exec_driver_sql("PRAGMA table_info(books)")}
+    if "version" not in columns:
+        connection.exec_driver_sql("ALTER TABLE books ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS catalog_version (id INTEGER NOT NULL, version INTEGER NOT NULL, PRIMARY KEY (id))"
+    )
+    connection.exec_driver_sql("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1)")
+
+
+def _add_book_categories(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS book_categories ("
+        "book_id VARCHAR NOT NULL, category VARCHAR NOT NULL, PRIMARY KEY (book_id, category), "
+        "FOREIGN KEY(book_id) REFERENCES books (id))"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_book_categories_category_book_id ON book_categories (category, book_id)"
+    )
+    # Books stored before this migration kept only their first category
+    connection.exec_driver_sql(
+        "INSERT OR IGNORE INTO book_categories (book_id, category) SELECT id, category FROM books"
+    )
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_books_author_title_id ON books (author, title, id)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_books_status_title_id ON books (status, title, id)")
+    connection.exec_driver_sql("ANALYZE")
+
+
+# Append only: the position of a migration is its schema version, stored in PRAGMA user_version
+MIGRATIONS: list[tuple[str, Callable[[Connection], None]]] = [
+    ("create users and books tables", _create_tables),
+    ("index books by title and by borrower", _create_book_indexes),
+    ("create and backfill the books full-text index", create_books_fts),
+    ("add book versions and the catalog version", _add_book_versions),
+    ("store every category of a book and index the listing filters", _add_book_categories),
+]
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def schema_version(connection: Connection) -> int:
+    version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    return int(version or 0)
+
+
+def check_schema_version(connection: Connection) -> None:
+    """Fail fast when the database is not at the schema version this code expects."""
+    version = schema_version(connection)
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}: run `python -m app.cli migrate`"
+        )
+    if version > LATEST_VERSION:
+        raise SchemaVersionError(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+
+
+def migrate(engine: Engine) -> list[str]:
+    """Apply pending migrations in order and return their descriptions.
+
+    Every migration is idempotent, so one interrupted before its version was recorded can simply run again.
+    """
+    applied = []
+    with engine.connect() as connection:
+        for version, (description, apply) in enumerate(MIGRATIONS, start=1):
+            if version <= schema_version(connection):
+                continue
+            logger.info("Migrating database schema to version %d: %s", version, description)
+            apply(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {version}")
+            connection.commit()
+            applied.append(description)
+    return applied
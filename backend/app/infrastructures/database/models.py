@@ -1,8 +1,9 @@
 #!/usr/bin/env python
-from sqlalchemy import Boolean, Column, ForeignKey, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+# The tables are created by the versioned migrations in migrations.py, which these models must match
 class Base(DeclarativeBase):
     pass
 
@@ -22,14 +23,48 @@ class UserModel(Base):
 
 class BookModel(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # Supports title filtering and the (title, id) ordering used for pagination
+        Index("ix_books_title_id", "title", "id"),
+        # Covering index for looking up the books a user has borrowed
+        Index("ix_books_borrowed_by_id_id", "borrowed_by_id", "id"),
+        # Author and status filters, in the (title, id) order of listings
+        Index("ix_books_author_title_id", "author", "title", "id"),
+        Index("ix_books_status_title_id", "status", "title", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     title: Mapped[str] = mapped_column(String)
     author: Mapped[str] = mapped_column(String)
     description: Mapped[str] = mapped_column(Text, nullable=True)
+    # Categories joined with ", " as shown to clients; filtering and facets use book_categories
     category: Mapped[str] = mapped_column(String)
     status: Mapped[str] = mapped_column(String, default="available")  # available, borrowed
+    # Catalog version of the last write to this book, so it increases on every change and is never reused
+    version: Mapped[int] = mapped_column(Integer, default=1)
 
     # Relationship with UserModel
     borrowed_by_id = Column(String, ForeignKey("users.id"), nullable=True)
     borrowed_by = relationship("UserModel", back_populates="borrowed_books")
+
+
+class BookCategoryModel(Base):
+    """One row per category of a book."""
+
+    __tablename__ = "book_categories"
+    __table_args__ = (
+        # Finds the books of a category and counts them without touching the books table
+        Index("ix_book_categories_category_book_id", "category", "book_id"),
+    )
+
+    book_id: Mapped[str] = mapped_column(String, ForeignKey("books.id"), primary_key=True)
+    category: Mapped[str] = mapped_column(String, primary_key=True)
+
+
+class CatalogVersionModel(Base):
+    """Single row counting writes to the books table; listings are validated against it."""
+
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
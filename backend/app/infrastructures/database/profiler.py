@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+from collections import Counter
+from contextvars import ContextVar
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+_MAX_LOGGED_PARAMETERS_LENGTH = 500
+
+
+class QueryProfile:
+    """Queries executed while handling one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times, usually a query issued once per row (N+1)."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# Profile of the request being handled; engine events run in the caller's context, also for async sessions
+current_profile: ContextVar[QueryProfile | None] = ContextVar("current_profile", default=None)
+
+
+def enable_profiler(slow_query_seconds: float) -> None:
+    """Profile every statement of every engine and log those slower than `slow_query_seconds`."""
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def start_timer(conn: Any, *_: Any) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def record(conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any) -> None:
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        profile = current_profile.get()
+        if profile is not None:
+            profile.count += 1
+            profile.duration += duration
+            profile.statements[statement] += 1
+        if duration >= slow_query_seconds:
+            logger.warning(
+                "Slow query (%.1f ms): %s parameters=%.*s",
+                duration * 1000,
+                statement,
+                _MAX_LOGGED_PARAMETERS_LENGTH,
+                repr(parameters),
+            )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+from collections.abc import Iterable, Mapping, Sequence
+import hashlib
+import re
+from typing import Any
+
+from sqlalchemy import Boolean, ColumnElement, Connection, column, literal_column, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BOOKS_FTS_TABLE = "books_fts"
+
+# Lightweight table construct so queries can join and order on the virtual table
+books_fts = table(BOOKS_FTS_TABLE, column("book_id"), column("rank"))
+
+_BACKFILL_BATCH_SIZE = 1000
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_UPSERT = text(
+    "INSERT OR REPLACE INTO books_fts(rowid, book_id, title, author, description) "
+    "VALUES (:rowid, :book_id, :title, :author, :description)"
+)
+_DELETE = text("DELETE FROM books_fts WHERE rowid = :rowid")
+
+
+def fts_rowid(book_id: str) -> int:
+    """Map a book id to a stable FTS rowid.
+
+    Book ids are strings, so the books table has no INTEGER PRIMARY KEY and its implicit
+    rowid may be renumbered by VACUUM. A 63-bit digest of the id stays stable instead.
+    """
+    return int.from_bytes(hashlib.blake2b(book_id.encode(), digest_size=8).digest()) >> 1
+
+
+def to_match_query(query: str) -> str | None:
+    """Turn free text into an FTS5 query that ANDs every word as a quoted prefix term."""
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def match(query: str) -> ColumnElement[bool]:
+    return literal_column(BOOKS_FTS_TABLE).op("MATCH", return_type=Boolean)(query)
+
+
+def create_books_fts(connection: Connection) -> None:
+    """Create the books full-text index if missing and backfill it from the books table."""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": BOOKS_FTS_TABLE},
+    ).first()
+    if exists:
+        return
+
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE books_fts USING fts5("
+        "book_id UNINDEXED, title, author, description, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    connection.exec_driver_sql(
+        # Default bm25 column weights for `rank`: book_id (not indexed), title, author, description
+        "INSERT INTO books_fts(books_fts, rank) VALUES ('rank', 'bm25(0.0, 10.0, 5.0, 1.0)')"
+    )
+
+    rows = connection.execute(text("SELECT id, title, author, description FROM books")).yield_per(_BACKFILL_BATCH_SIZE)
+    for batch in rows.partitions():
+        connection.execute(
+            _UPSERT,
+            [
+                {
+                    "rowid": fts_rowid(row.id),
+                    "book_id": row.id,
+                    "title": row.title,
+                    "author": row.author,
+                    "description": row.description or "",
+                }
+                for row in batch
+            ],
+        )
+
+
+async def index_books(session: AsyncSession, books: Sequence[Mapping[str, Any]]) -> None:
+    """Upsert FTS rows for book rows holding `id`, `title`, `author` and `description`."""
+    await session.execute(
+        _UPSERT,
+        [
+            {
+                "rowid": fts_rowid(book["id"]),
+                "book_id": book["id"],
+                "title": book["title"],
+                "author": book["author"],
+                "description": book["description"] or "",
+            }
+            for book in books
+        ],
+    )
+
+
+async def unindex_books(session: AsyncSession, book_ids: Iterable[str]) -> None:
+    await session.execute(_DELETE, [{"rowid": fts_rowid(book_id)} for book_id in book_ids])
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.book import Book
+from app.domain.models.user import User
+from app.domain.services.unit_of_work import IUnitOfWork
+from app.infrastructures.cache import TTLCache
+from app.infrastructures.metrics import TimedBookRepository, TimedUserRepository
+
+from .database import BookRepository, UserRepository
+
+
+class UnitOfWork(IUnitOfWork):
+    def __init__(
+        self,
+        session: AsyncSession,
+        book_cache: TTLCache[str, Book] | None = None,
+        user_cache: TTLCache[str, User] | None = None,
+    ) -> None:
+        self.session = session
+        # Callers get timed repositories; the unit of work keeps the database ones to flush them
+        self._books = BookRepository(session, autocommit=False)
+        self._users = UserRepository(session, autocommit=False)
+        self.books = TimedBookRepository(self._books)
+        self.users = TimedUserRepository(self._users)
+        self.book_cache = book_cache
+        self.user_cache = user_cache
+
+    async def commit(self) -> None:
+        await self._books.flush_pending()
+        await self._users.flush_pending()
+        await self.session.commit()
+
+        # Evict cached entities only now that the new rows are visible to other sessions
+        if self.book_cache is not None:
+            for book_id in self._books.written_ids:
+                self.book_cache.invalidate(book_id)
+        if self.user_cache is not None:
+            for user_id in self._users.written_ids:
+                self.user_cache.invalidate(user_id)
+        self._books.written_ids.clear()
+        self._users.written_ids.clear()
+
+    async def rollback(self) -> None:
+        self._books.discard_pending()
+        self._users.discard_pending()
+        self._books.written_ids.clear()
+        self._users.written_ids.clear()
+        await self.session.rollback()
@@ -0,0 +1,68 @@
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+import logging
+
+from app.domain.services.book import BookEvent, IBookEventPublisher
+from app.infrastructures.metrics import BOOK_EVENT_SUBSCRIBERS, BOOK_EVENT_SUBSCRIBERS_DROPPED, BOOK_EVENTS_PUBLISHED
+
+logger = logging.getLogger(__name__)
+
+
+class BookEventSubscription:
+    """Events published since subscribing, buffered up to `maxsize` until the subscriber takes them."""
+
+    def __init__(self, maxsize: int) -> None:
+        # None marks the end of the subscription
+        self.queue: asyncio.Queue[BookEvent | None] = asyncio.Queue(maxsize)
+        self.closed = False
+
+    async def get(self) -> BookEvent | None:
+        """Wait for the next event. Return None once the subscription is closed."""
+        if self.closed:
+            # Events still buffered are discarded: a dropped subscriber has to reload anyway
+            return None
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.closed = True
+        # Wakes a subscriber waiting on an empty queue; a full queue has no one waiting
+        with suppress(asyncio.QueueFull):
+            self.queue.put_nowait(None)
+
+
+class BookEventBroker(IBookEventPublisher):
+    """In-process fan-out of book events, with one bounded queue per subscriber.
+
+    Publishing never waits: a subscriber whose queue is full is closed and dropped, so one slow
+    client cannot hold back writes or grow memory. Only events published by this process are seen.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.subscriptions: set[BookEventSubscription] = set()
+
+    def publish(self, event: BookEvent) -> None:
+        BOOK_EVENTS_PUBLISHED.labels(event.type.value).inc()
+        for subscription in list(self.subscriptions):
+            if subscription.queue.full():
+                logger.warning("Dropping a book event subscriber %d events behind", self.queue_size)
+                BOOK_EVENT_SUBSCRIBERS_DROPPED.inc()
+                self._remove(subscription)
+            else:
+                subscription.queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[BookEventSubscription]:
+        subscription = BookEventSubscription(self.queue_size)
+        self.subscriptions.add(subscription)
+        BOOK_EVENT_SUBSCRIBERS.set(len(self.subscriptions))
+        try:
+            yield subscription
+        finally:
+            self._remove(subscription)
+
+    def _remove(self, subscription: BookEventSubscription) -> None:
+        subscription.close()
+        self.subscriptions.discard(subscription)
+        BOOK_EVENT_SUBSCRIBERS.set(len(self.subscriptions))
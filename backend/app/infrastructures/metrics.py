@@ -0,0 +1,169 @@
+from collections.abc import AsyncIterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.domain.models.book import (
+    Book,
+    Id as BookId,
+)
+from app.domain.models.user import (
+    Email,
+    Id as UserId,
+    User,
+)
+from app.domain.services.book import (
+    BookFilter,
+    BookRow,
+    IBookQueryService,
+    IBookRepository,
+)
+from app.domain.services.user import IUserRepository
+
+# Buckets in seconds, from sub-millisecond cache hits to slow bulk requests
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, including the time to send the response body",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REPOSITORY_LATENCY = Histogram(
+    "repository_call_duration_seconds",
+    "Latency of repository calls",
+    ["repository", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "response_cache_lookups_total",
+    "Response cache lookups by endpoint and result (hit or miss)",
+    ["endpoint", "result"],
+)
+
+BOOK_EVENTS_PUBLISHED = Counter("book_events_published_total", "Book events published, by type", ["type"])
+BOOK_EVENT_SUBSCRIBERS = Gauge("book_event_subscribers", "Open subscriptions to the book event feed")
+BOOK_EVENT_SUBSCRIBERS_DROPPED = Counter(
+    "book_event_subscribers_dropped_total", "Subscribers dropped because they did not keep up with the feed"
+)
+
+
+class TimedBookRepository(IBookRepository):
+    """Records the latency of every call to the wrapped repository."""
+
+    def __init__(self, repository: IBookRepository) -> None:
+        self.repository = repository
+
+    async def find_by_id(self, book_id: BookId) -> Book | None:
+        with REPOSITORY_LATENCY.labels("book", "find_by_id").time():
+            return await self.repository.find_by_id(book_id)
+
+    async def find_version(self, book_id: BookId) -> int | None:
+        with REPOSITORY_LATENCY.labels("book", "find_version").time():
+            return await self.repository.find_version(book_id)
+
+    async def find_all(self) -> list[Book]:
+        with REPOSITORY_LATENCY.labels("book", "find_all").time():
+            return await self.repository.find_all()
+
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[Book]:
+        # Not timed: the duration of a stream depends on its consumer
+        return self.repository.stream_all(batch_size)
+
+    async def find_ids_by_borrower(self, user_id: UserId) -> list[BookId]:
+        with REPOSITORY_LATENCY.labels("book", "find_ids_by_borrower").time():
+            return await self.repository.find_ids_by_borrower(user_id)
+
+    async def save(self, book: Book) -> None:
+        with REPOSITORY_LATENCY.labels("book", "save").time():
+            await self.repository.save(book)
+
+    async def insert_new(self, books: list[Book]) -> list[BookId]:
+        with REPOSITORY_LATENCY.labels("book", "insert_new").time():
+            return await self.repository.insert_new(books)
+
+    async def mark_borrowed(self, book_id: BookId, user_id: UserId) -> Book | None:
+        with REPOSITORY_LATENCY.labels("book", "mark_borrowed").time():
+            return await self.repository.mark_borrowed(book_id, user_id)
+
+    async def mark_returned(self, book_id: BookId, borrower_id: UserId | None = None) -> Book | None:
+        with REPOSITORY_LATENCY.labels("book", "mark_returned").time():
+            return await self.repository.mark_returned(book_id, borrower_id)
+
+    async def mark_many_borrowed(self, book_ids: list[BookId], user_id: UserId) -> list[Book]:
+        with REPOSITORY_LATENCY.labels("book", "mark_many_borrowed").time():
+            return await self.repository.mark_many_borrowed(book_ids, user_id)
+
+    async def mark_many_returned(self, book_ids: list[BookId], borrower_id: UserId | None = None) -> list[Book]:
+        with REPOSITORY_LATENCY.labels("book", "mark_many_returned").time():
+            return await self.repository.mark_many_returned(book_ids, borrower_id)
+
+    async def delete(self, book_id: BookId) -> None:
+        with REPOSITORY_LATENCY.labels("book", "delete").time():
+            await self.repository.delete(book_id)
+
+
+class TimedUserRepository(IUserRepository):
+    """Records the latency of every call to the wrapped repository."""
+
+    def __init__(self, repository: IUserRepository) -> None:
+        self.repository = repository
+
+    async def find_by_id(self, user_id: UserId) -> User | None:
+        with REPOSITORY_LATENCY.labels("user", "find_by_id").time():
+            return await self.repository.find_by_id(user_id)
+
+    async def find_by_email(self, email: Email) -> User | None:
+        with REPOSITORY_LATENCY.labels("user", "find_by_email").time():
+            return await self.repository.find_by_email(email)
+
+    async def find_all(self) -> list[User]:
+        with REPOSITORY_LATENCY.labels("user", "find_all").time():
+            return await self.repository.find_all()
+
+    async def save(self, user: User) -> None:
+        with REPOSITORY_LATENCY.labels("user", "save").time():
+            await self.repository.save(user)
+
+    async def delete(self, user_id: UserId) -> None:
+        with REPOSITORY_LATENCY.labels("user", "delete").time():
+            await self.repository.delete(user_id)
+
+
+class TimedBookQueryService(IBookQueryService):
+    """Records the latency of every call to the wrapped query service."""
+
+    def __init__(self, queries: IBookQueryService) -> None:
+        self.queries = queries
+
+    async def find_page(self, offset: int, limit: int, filters: BookFilter) -> list[BookRow]:
+        with REPOSITORY_LATENCY.labels("book_query", "find_page").time():
+            return await self.queries.find_page(offset, limit, filters)
+
+    async def find_after(self, limit: int, after: tuple[str, str] | None, filters: BookFilter) -> list[BookRow]:
+        with REPOSITORY_LATENCY.labels("book_query", "find_after").time():
+            return await self.queries.find_after(limit, after, filters)
+
+    async def count(self, filters: BookFilter) -> int:
+        with REPOSITORY_LATENCY.labels("book_query", "count").time():
+            return await self.queries.count(filters)
+
+    async def count_by_category(self, filters: BookFilter) -> dict[str, int]:
+        with REPOSITORY_LATENCY.labels("book_query", "count_by_category").time():
+            return await self.queries.count_by_category(filters)
+
+    async def count_by_status(self, filters: BookFilter) -> dict[str, int]:
+        with REPOSITORY_LATENCY.labels("book_query", "count_by_status").time():
+            return await self.queries.count_by_status(filters)
+
+    async def search(self, query: str, offset: int, limit: int) -> list[BookRow]:
+        with REPOSITORY_LATENCY.labels("book_query", "search").time():
+            return await self.queries.search(query, offset, limit)
+
+    async def count_search(self, query: str) -> int:
+        with REPOSITORY_LATENCY.labels("book_query", "count_search").time():
+            return await self.queries.count_search(query)
+
+    async def catalog_version(self) -> int:
+        with REPOSITORY_LATENCY.labels("book_query", "catalog_version").time():
+            return await self.queries.catalog_version()
@@ -0,0 +1,46 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from app.domain.services.password import IPasswordHasher
+
+
+class PasswordHasher(IPasswordHasher):
+    """Argon2 hashing on a bounded thread pool, so slow hashes never run on the event loop.
+
+    Passwords stored before hashing was introduced are still accepted as plaintext and, like hashes
+    with older cost parameters, are replaced by a current hash on the next successful login.
+    """
+
+    def __init__(self, time_cost: int, memory_cost: int, max_workers: int) -> None:
+        self.context = CryptContext(
+            schemes=["argon2", "plaintext"],
+            deprecated="auto",
+            argon2__time_cost=time_cost,
+            argon2__memory_cost=memory_cost,
+            argon2__parallelism=1,
+        )
+        # argon2 releases the GIL, so the workers hash in parallel; the pool bounds CPU and memory use
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        # Verified when the email is unknown, so that lookups take as long as for existing users
+        self._dummy_hash = self.context.hash("")
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str | None) -> tuple[bool, str | None]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._verify_and_update, password, password_hash
+        )
+
+    def _verify_and_update(self, password: str, password_hash: str | None) -> tuple[bool, str | None]:
+        if password_hash is None:
+            self.context.verify(password, self._dummy_hash)
+            return False, None
+        try:
+            valid, new_hash = self.context.verify_and_update(password, password_hash)
+        except ValueError:
+            # Malformed hash
+            return False, None
+        return bool(valid), new_hash
@@ -1,66 +1,186 @@
+from collections.abc import AsyncIterator
+import io
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, UploadFile, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.presentation.dependencies import get_book_usecase, get_current_user, get_current_user_admin
+from app.domain.models.book import BookStatus, Category
+from app.domain.services.book import BookFilter
+from app.infrastructures.catalog_io import CatalogFormat, format_header, format_records, read_records
+from app.presentation.dependencies import (
+    get_book_event_feed,
+    get_book_loan_usecase,
+    get_book_query_usecase,
+    get_book_usecase,
+    get_catalog_usecase,
+    get_current_user,
+    get_current_user_admin,
+    get_export_usecase,
+    get_response_cache,
+)
+from app.presentation.etag import is_not_modified, make_etag
+from app.presentation.event_feed import BookEventFeed
+from app.presentation.response_cache import ResponseCache
 from app.presentation.schemas.book import (
+    BookBatchBorrowRequest,
+    BookBatchRequest,
     BookBorrowRequest,
     BookCreate,
+    BookFacetsResponse,
+    BookImportError,
+    BookImportResponse,
     BookListResponse,
     BookResponse,
     BookUpdate,
 )
-from app.usecase.book import BookUseCase
+from app.usecase.book import BookLoanUseCase, BookQueryUseCase, BookUseCase, encode_cursor
+from app.usecase.catalog import CatalogUseCase
 
 router = APIRouter(prefix="/api/books", tags=["books"])
 
 
-@router.get("")
-async def get_books(
-    book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
+def get_book_filter(
+    title: Annotated[str | None, Query(description="Filter by title")] = None,
+    author: Annotated[str | None, Query(description="Filter by author (exact match)")] = None,
+    category: Annotated[Category | None, Query(description="Filter by category")] = None,
+    book_status: Annotated[BookStatus | None, Query(alias="status", description="Filter by status")] = None,
+) -> BookFilter:
+    # An empty title matches every book, like no title filter
+    return BookFilter(title=title or None, author=author, category=category, status=book_status)
+
+
+@router.get("", response_model=BookListResponse)
+async def get_books(  # noqa: PLR0917 - FastAPI passes parameters by name
+    request: Request,
+    book_query_usecase: Annotated[BookQueryUseCase, Depends(get_book_query_usecase)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    filters: Annotated[BookFilter, Depends(get_book_filter)],
     page: Annotated[int, Query(ge=1, description="Page number")] = 1,
     limit: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
-    title: Annotated[str | None, Query(description="Filter by title")] = None,
-) -> BookListResponse:
-    books = book_usecase.get_all_books(page=page, limit=limit, title=title)
-    return BookListResponse(
-        items=[
-            BookResponse(
-                id=book.id.value,
-                title=book.title.value,
-                author=book.author.value,
-                description=book.description.value if book.description else None,
-                category=", ".join([cat.value for cat in book.category]) if book.category else "",
-                status=book.status.value,
-                borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
-            )
-            for book in books
-        ],
-        total=len(books),  # In a real app, we would get the total count from the database
-        page=page,
-        limit=limit,
+    cursor: Annotated[
+        str | None, Query(description="Cursor from a previous response; switches to keyset pagination")
+    ] = None,
+) -> Response:
+    # Any write to a book bumps the catalog version. It is read before the page, so a write landing
+    # in between pairs the new page with the old version and only costs a client one extra fetch
+    catalog_version = await book_query_usecase.get_catalog_version()
+    etag = make_etag(catalog_version)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    async def render() -> dict[str, Any]:
+        total = await book_query_usecase.count_books(filters)
+        if cursor is not None:
+            try:
+                books, next_cursor = await book_query_usecase.get_books_after(
+                    cursor=cursor, limit=limit, filters=filters
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+        else:
+            books = await book_query_usecase.get_all_books(page=page, limit=limit, filters=filters)
+            # Offset pages also hand out a cursor so clients can continue by keyset
+            has_more = (page - 1) * limit + len(books) < total
+            next_cursor = encode_cursor(books[-1]) if books and has_more else None
+        # Rows already have the shape of BookResponse, so they are serialized as-is without revalidation
+        return {"items": books, "total": total, "page": page, "limit": limit, "next_cursor": next_cursor}
+
+    body = await response_cache.get_or_render("list", catalog_version, (page, limit, filters, cursor), render)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/search", response_model=BookListResponse)
+async def search_books(  # noqa: PLR0917 - FastAPI passes parameters by name
+    request: Request,
+    book_query_usecase: Annotated[BookQueryUseCase, Depends(get_book_query_usecase)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    q: Annotated[str, Query(min_length=1, description="Words to match in title, author or description")],
+    page: Annotated[int, Query(ge=1, description="Page number")] = 1,
+    limit: Annotated[int, Query(ge=1, le=100, description="Items per page")] = 10,
+) -> Response:
+    catalog_version = await book_query_usecase.get_catalog_version()
+    etag = make_etag(catalog_version)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    async def render() -> dict[str, Any]:
+        books = await book_query_usecase.search_books(q, page=page, limit=limit)
+        total = await book_query_usecase.count_search_results(q)
+        return {"items": books, "total": total, "page": page, "limit": limit, "next_cursor": None}
+
+    # Search only sees the words of the query, so spacing does not make a new entry
+    body = await response_cache.get_or_render("search", catalog_version, (" ".join(q.split()), page, limit), render)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/facets", response_model=BookFacetsResponse)
+async def get_book_facets(
+    request: Request,
+    book_query_usecase: Annotated[BookQueryUseCase, Depends(get_book_query_usecase)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    filters: Annotated[BookFilter, Depends(get_book_filter)],
+) -> Response:
+    catalog_version = await book_query_usecase.get_catalog_version()
+    etag = make_etag(catalog_version)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    async def render() -> dict[str, dict[str, int]]:
+        return await book_query_usecase.get_facets(filters)
+
+    body = await response_cache.get_or_render("facets", catalog_version, (filters,), render)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def book_events(book_event_feed: Annotated[BookEventFeed, Depends(get_book_event_feed)]) -> StreamingResponse:
+    # Each committed change is sent as an event named after its type, with a BookEventResponse as data
+    return StreamingResponse(
+        book_event_feed.stream(),
+        media_type="text/event-stream",
+        # Proxies must neither cache nor buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-@router.get("/{book_id}")
+@router.get("/export")
+async def export_books(
+    catalog_usecase: Annotated[CatalogUseCase, Depends(get_export_usecase)],
+    current_user_admin: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can export books
+    file_format: Annotated[CatalogFormat, Query(alias="format", description="Export format")] = CatalogFormat.JSONL,
+) -> StreamingResponse:
+    async def body() -> AsyncIterator[bytes]:
+        yield format_header(file_format).encode()
+        async for records in catalog_usecase.export_books():
+            yield format_records(records, file_format).encode()
+
+    return StreamingResponse(
+        body(),
+        media_type=file_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="books.{file_format.value}"'},
+    )
+
+
+@router.get("/{book_id}", response_model=BookResponse)
 async def get_book(
     book_id: Annotated[str, Path(..., description="The ID of the book to get")],
+    request: Request,
+    response: Response,
     book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
-) -> BookResponse:
-    book = book_usecase.get_book_by_id(book_id)
+) -> BookResponse | Response:
+    # Revalidation only needs the version, so an unchanged book is neither loaded nor serialized
+    if request.headers.get("if-none-match"):
+        version = await book_usecase.get_book_version(book_id)
+        if version is not None and is_not_modified(request, etag := make_etag(version)):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    book = await book_usecase.get_book_by_id(book_id)
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
-    return BookResponse(
-        id=book.id.value,
-        title=book.title.value,
-        author=book.author.value,
-        description=book.description.value if book.description else None,
-        category=", ".join([cat.value for cat in book.category]) if book.category else "",
-        status=book.status.value,
-        borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
-    )
+    response.headers["ETag"] = make_etag(book.version)
+    return BookResponse.from_domain(book)
 
 
 @router.post("")
@@ -69,21 +189,40 @@ async def create_book(
     book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
     current_user_admin: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can create books
 ) -> BookResponse:
-    book = book_usecase.create_book(
+    book = await book_usecase.create_book(
         title=book_data.title,
         author=book_data.author,
         description=book_data.description,
         category=book_data.category,
     )
 
-    return BookResponse(
-        id=book.id.value,
-        title=book.title.value,
-        author=book.author.value,
-        description=book.description.value if book.description else None,
-        category=", ".join([cat.value for cat in book.category]) if book.category else "",
-        status=book.status.value,
-        borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
+    return BookResponse.from_domain(book)
+
+
+@router.post("/import")
+async def import_books(
+    file: UploadFile,
+    catalog_usecase: Annotated[CatalogUseCase, Depends(get_catalog_usecase)],
+    current_user_admin: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can import books
+    file_format: Annotated[
+        CatalogFormat | None, Query(alias="format", description="File format; inferred from the file name if omitted")
+    ] = None,
+) -> BookImportResponse:
+    file_format = file_format or CatalogFormat.from_filename(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown file format, use csv or jsonl")
+
+    # The upload is spooled to disk, so rows are read lazily instead of loading the whole file
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await catalog_usecase.import_books(read_records(stream, file_format))
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be UTF-8 encoded") from e
+
+    return BookImportResponse(
+        imported=report.imported,
+        failed=report.failed,
+        errors=[BookImportError(line=error.line, message=error.message) for error in report.errors],
     )
 
 
@@ -94,7 +233,7 @@ async def update_book(
     book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
     current_user_admin: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can update books
 ) -> BookResponse:
-    book = book_usecase.update_book(
+    book = await book_usecase.update_book(
         book_id=book_id,
         title=book_data.title,
         author=book_data.author,
@@ -105,15 +244,7 @@ async def update_book(
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
-    return BookResponse(
-        id=book.id.value,
-        title=book.title.value,
-        author=book.author.value,
-        description=book.description.value if book.description else None,
-        category=", ".join([cat.value for cat in book.category]) if book.category else "",
-        status=book.status.value,
-        borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
-    )
+    return BookResponse.from_domain(book)
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -122,7 +253,7 @@ async def delete_book(
     book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
     current_user_admin: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can delete books
 ) -> JSONResponse:
-    success = book_usecase.delete_book(book_id)
+    success = await book_usecase.delete_book(book_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
@@ -143,22 +274,14 @@ async def borrow_book(
             detail="You can only borrow books for yourself unless you are an admin",
         )
 
-    book = book_usecase.borrow_book(book_id, borrow_data.user_id)
+    book = await book_usecase.borrow_book(book_id, borrow_data.user_id)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Book not found or not available for borrowing",
         )
 
-    return BookResponse(
-        id=book.id.value,
-        title=book.title.value,
-        author=book.author.value,
-        description=book.description.value if book.description else None,
-        category=", ".join([cat.value for cat in book.category]) if book.category else "",
-        status=book.status.value,
-        borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
-    )
+    return BookResponse.from_domain(book)
 
 
 @router.post("/{book_id}/return")
@@ -167,31 +290,81 @@ async def return_book(
     book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
     current_user: Annotated[dict[str, Any], Depends(get_current_user)],
 ) -> BookResponse:
-    # Get the book to check if the current user is the one who borrowed it
-    book = book_usecase.get_book_by_id(book_id)
+    # Non-admins may only return books they borrowed; the check is part of the conditional update
+    borrower_id = None if current_user["is_admin"] else current_user["id"]
+    book = await book_usecase.return_book(book_id, borrower_id=borrower_id)
     if not book:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+        # The update did not apply, so look the book up to report why
+        book = await book_usecase.get_book_by_id(book_id)
+        if not book:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+
+        # Check if the user is returning their own book or if they are an admin
+        if book.borrowed_by and book.borrowed_by.value != current_user["id"] and not current_user["is_admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only return books you have borrowed unless you are an admin",
+            )
 
-    # Check if the user is returning their own book or if they are an admin
-    if book.borrowed_by and book.borrowed_by.value != current_user["id"] and not current_user["is_admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book not found or not currently borrowed",
+        )
+
+    return BookResponse.from_domain(book)
+
+
+@router.post("/borrow")
+async def borrow_books(
+    borrow_data: BookBatchBorrowRequest,
+    book_loan_usecase: Annotated[BookLoanUseCase, Depends(get_book_loan_usecase)],
+    current_user: Annotated[dict[str, Any], Depends(get_current_user)],
+) -> list[BookResponse]:
+    # Same rules as borrowing a single book; all the books are borrowed or none is
+    if borrow_data.user_id != current_user["id"] and not current_user["is_admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only return books you have borrowed unless you are an admin",
+            detail="You can only borrow books for yourself unless you are an admin",
         )
 
-    book = book_usecase.return_book(book_id)
-    if not book:
+    books, failed_ids = await book_loan_usecase.borrow_books(borrow_data.book_ids, borrow_data.user_id)
+    if failed_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Book not found or not currently borrowed",
+            detail=f"Books not found or not available for borrowing: {', '.join(failed_ids)}",
         )
 
-    return BookResponse(
-        id=book.id.value,
-        title=book.title.value,
-        author=book.author.value,
-        description=book.description.value if book.description else None,
-        category=", ".join([cat.value for cat in book.category]) if book.category else "",
-        status=book.status.value,
-        borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
-    )
+    return [BookResponse.from_domain(book) for book in books]
+
+
+@router.post("/return")
+async def return_books(
+    return_data: BookBatchRequest,
+    book_loan_usecase: Annotated[BookLoanUseCase, Depends(get_book_loan_usecase)],
+    book_usecase: Annotated[BookUseCase, Depends(get_book_usecase)],
+    current_user: Annotated[dict[str, Any], Depends(get_current_user)],
+) -> list[BookResponse]:
+    # Same rules as returning a single book; all the books are returned or none is
+    borrower_id = None if current_user["is_admin"] else current_user["id"]
+    books, failed_ids = await book_loan_usecase.return_books(return_data.book_ids, borrower_id=borrower_id)
+    if failed_ids:
+        # Nothing was returned, so look up the books that failed to report why
+        failed_books = [await book_usecase.get_book_by_id(book_id) for book_id in failed_ids]
+        missing_ids = [book_id for book_id, book in zip(failed_ids, failed_books, strict=True) if not book]
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Books not found: {', '.join(missing_ids)}"
+            )
+        if not current_user["is_admin"] and any(
+            book and book.borrowed_by and book.borrowed_by.value != current_user["id"] for book in failed_books
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only return books you have borrowed unless you are an admin",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Books not currently borrowed: {', '.join(failed_ids)}",
+        )
+
+    return [BookResponse.from_domain(book) for book in books]
@@ -31,7 +31,7 @@ async def register_user(
     user_usecase: Annotated[UserUseCase, Depends(get_user_usecase)],
 ) -> UserResponse:
     try:
-        user = user_usecase.create_user(
+        user = await user_usecase.create_user(
             name=user_data.name,
             email=user_data.email,
             password=user_data.password,
@@ -53,7 +53,7 @@ async def login_user(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     user_usecase: Annotated[UserUseCase, Depends(get_user_usecase)],
 ) -> TokenResponse:
-    user = user_usecase.authenticate_user(form_data.username, form_data.password)
+    user = await user_usecase.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,7 +81,7 @@ async def get_user(
             detail="You can only access your own user information unless you are an admin",
         )
 
-    user = user_usecase.get_user_by_id(user_id)
+    user = await user_usecase.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -107,7 +107,7 @@ async def update_user(
             detail="You can only update your own user information unless you are an admin",
         )
 
-    user = user_usecase.update_user(
+    user = await user_usecase.update_user(
         user_id=user_id,
         name=user_data.name,
         password=user_data.password,
@@ -131,7 +131,7 @@ async def delete_user(
     user_usecase: Annotated[UserUseCase, Depends(get_user_usecase)],
     _: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can delete users
 ) -> JSONResponse:
-    success = user_usecase.delete_user(user_id)
+    success = await user_usecase.delete_user(user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -143,7 +143,7 @@ async def get_all_users(
     user_usecase: Annotated[UserUseCase, Depends(get_user_usecase)],
     _: Annotated[dict[str, Any], Depends(get_current_user_admin)],  # Only admin can get all users
 ) -> UserListResponse:
-    users = user_usecase.get_all_users()
+    users = await user_usecase.get_all_users()
 
     return UserListResponse(
         items=[
@@ -174,12 +174,12 @@ async def get_user_books(
         )
 
     # Check if the user exists
-    user = user_usecase.get_user_by_id(user_id)
+    user = await user_usecase.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     # Get the user's books
-    book_ids = user_usecase.get_user_books(user_id)
+    book_ids = await user_usecase.get_user_books(user_id)
 
     return UserBooksResponse(
         user_id=user_id,
@@ -1,17 +1,32 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import time
 from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.services.book import IBookRepository
+from app.config import settings
+from app.domain.models.book import Book
+from app.domain.models.user import User
+from app.domain.services.book import IBookQueryService, IBookRepository
+from app.domain.services.unit_of_work import IUnitOfWork
 from app.domain.services.user import IUserRepository
-from app.infrastructures.database.connection import SessionLocal
-from app.infrastructures.database.database import BookRepository, UserRepository
-from app.usecase.book import BookUseCase
+from app.infrastructures.cache import CachedBookRepository, CachedUserRepository, TTLCache
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal
+from app.infrastructures.database.database import BookQueryService, BookRepository, UserRepository
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.infrastructures.events import BookEventBroker
+from app.infrastructures.metrics import TimedBookQueryService, TimedBookRepository, TimedUserRepository
+from app.infrastructures.password import PasswordHasher
+from app.presentation.event_feed import BookEventFeed
+from app.presentation.response_cache import ResponseCache
+from app.usecase.book import BookLoanUseCase, BookQueryUseCase, BookUseCase
+from app.usecase.catalog import CatalogUseCase
 from app.usecase.user import UserUseCase
 
 # JWT settings
@@ -21,34 +36,117 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
+logger = logging.getLogger(__name__)
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+# Claims of verified tokens, keyed by token digest so raw tokens are not kept in memory
+token_cache: TTLCache[str, dict[str, Any]] = TTLCache(settings.token_cache_size, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Repository caches shared by all requests of this process
+book_cache: TTLCache[str, Book] = TTLCache(settings.repository_cache_size, settings.repository_cache_ttl_seconds)
+user_cache: TTLCache[str, User] = TTLCache(settings.repository_cache_size, settings.repository_cache_ttl_seconds)
+# Serialized listings and search results; keyed by catalog version, so writes never need to evict
+response_cache = ResponseCache(settings.response_cache_size if settings.response_cache_enabled else 0)
+# Committed book changes, pushed to the subscribers of the event feed connected to this process
+book_event_broker = BookEventBroker(settings.event_queue_size)
+book_event_feed = BookEventFeed(book_event_broker, settings.event_heartbeat_seconds)
+
+password_hasher = PasswordHasher(
+    time_cost=settings.password_hash_time_cost,
+    memory_cost=settings.password_hash_memory_cost,
+    max_workers=settings.password_hash_workers,
+)
+
+
+# Methods that never modify state; they are served from the read-only connection pool
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Mutations wait for the single writer connection, so they are serialized
+    session_factory = ReadSessionLocal if request.method in READ_ONLY_METHODS else AsyncSessionLocal
+    async with session_factory() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_book_repository(db: Annotated[Session, Depends(get_db)]) -> IBookRepository:
-    return BookRepository(db)
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    # Reads that may be followed by slow work whatever the method, so they never take the writer
+    async with ReadSessionLocal() as db:
+        yield db
+
+
+def get_book_repository(db: Annotated[AsyncSession, Depends(get_db)]) -> IBookRepository:
+    # Timers wrap the database repository, so cache hits are not recorded as queries
+    repository = TimedBookRepository(BookRepository(db))
+    if settings.repository_cache_enabled:
+        return CachedBookRepository(repository, book_cache)
+    return repository
+
+
+def get_book_queries(db: Annotated[AsyncSession, Depends(get_db)]) -> IBookQueryService:
+    return TimedBookQueryService(BookQueryService(db))
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
+
+
+def get_book_event_feed() -> BookEventFeed:
+    return book_event_feed
+
 
+def get_user_repository(db: Annotated[AsyncSession, Depends(get_db)]) -> IUserRepository:
+    repository = TimedUserRepository(UserRepository(db))
+    if settings.repository_cache_enabled:
+        return CachedUserRepository(repository, user_cache)
+    return repository
 
-def get_user_repository(db: Annotated[Session, Depends(get_db)]) -> IUserRepository:
-    return UserRepository(db)
+
+def get_user_reader(db: Annotated[AsyncSession, Depends(get_read_db)]) -> IUserRepository:
+    return TimedUserRepository(UserRepository(db))
+
+
+def get_unit_of_work(db: Annotated[AsyncSession, Depends(get_db)]) -> IUnitOfWork:
+    if settings.repository_cache_enabled:
+        return UnitOfWork(db, book_cache=book_cache, user_cache=user_cache)
+    return UnitOfWork(db)
 
 
 def get_book_usecase(
     book_repository: Annotated[IBookRepository, Depends(get_book_repository)],
 ) -> BookUseCase:
-    return BookUseCase(book_repository)
+    return BookUseCase(book_repository, book_event_broker)
+
+
+def get_book_query_usecase(
+    book_queries: Annotated[IBookQueryService, Depends(get_book_queries)],
+) -> BookQueryUseCase:
+    return BookQueryUseCase(book_queries)
+
+
+def get_book_loan_usecase(
+    unit_of_work: Annotated[IUnitOfWork, Depends(get_unit_of_work)],
+) -> BookLoanUseCase:
+    return BookLoanUseCase(unit_of_work, book_event_broker)
+
+
+def get_catalog_usecase(
+    unit_of_work: Annotated[IUnitOfWork, Depends(get_unit_of_work)],
+) -> CatalogUseCase:
+    return CatalogUseCase(unit_of_work)
+
+
+def get_export_usecase() -> CatalogUseCase:
+    # Streaming bodies are sent after request-scoped dependencies have been closed, so exports
+    # get their own session; the unit of work releases its connection when the stream ends
+    return CatalogUseCase(UnitOfWork(ReadSessionLocal()))
 
 
 def get_user_usecase(
     user_repository: Annotated[IUserRepository, Depends(get_user_repository)],
     book_repository: Annotated[IBookRepository, Depends(get_book_repository)],
+    user_reader: Annotated[IUserRepository, Depends(get_user_reader)],
 ) -> UserUseCase:
-    return UserUseCase(user_repository, book_repository)
+    return UserUseCase(user_repository, book_repository, password_hasher, user_reader)
 
 
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -62,6 +160,20 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
     return str(encoded_jwt)
 
 
+def _verify_token(token: str) -> dict[str, Any]:
+    """Return the claims of a valid token, verifying each distinct token only once while it is cached."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    claims = token_cache.get(key)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Cached claims must not outlive the token
+        expires_in = claims["exp"] - time.time() if "exp" in claims else None
+        if expires_in is None or expires_in > 0:
+            token_cache.set(key, claims, ttl=expires_in)
+        logger.debug("Verified token user_id=%s is_admin=%s", claims.get("sub"), claims.get("is_admin", False))
+    return claims
+
+
 def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dict[str, Any]:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,31 +181,25 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dict[str,
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Print token for debugging
-        print(f"Decoding token: {token[:10]}...")
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        email: str = payload.get("email")
-        is_admin: bool = payload.get("is_admin", False)
-
-        print(f"Decoded payload: user_id={user_id}, email={email}, is_admin={is_admin}")
-
-        if user_id is None or email is None:
-            raise credentials_exception
+        payload = _verify_token(token)
     except JWTError as e:
+        logger.info("Rejected token: %s", e)
         raise credentials_exception from e
 
+    user_id: str | None = payload.get("sub")
+    email: str | None = payload.get("email")
+    is_admin: bool = payload.get("is_admin", False)
+    if user_id is None or email is None:
+        raise credentials_exception
+
     return {"id": user_id, "email": email, "is_admin": is_admin}
 
 
 def get_current_user_admin(current_user: Annotated[dict[str, Any], Depends(get_current_user)]) -> dict[str, Any]:
-    print(f"Checking admin permissions for user: {current_user['email']}, is_admin={current_user['is_admin']}")
     if not current_user["is_admin"]:
-        print(f"User {current_user['email']} is not an admin")
+        logger.info("Denied admin access user_id=%s", current_user["id"])
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
-    print(f"User {current_user['email']} is an admin, granting access")
     return current_user
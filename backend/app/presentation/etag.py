@@ -0,0 +1,16 @@
+from fastapi import Request
+
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's copy, named by If-None-Match, is still current so 304 can be sent."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
@@ -0,0 +1,36 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from app.infrastructures.events import BookEventBroker
+from app.presentation.schemas.book import BookEventResponse
+
+# Milliseconds a client waits before reconnecting, e.g. after being dropped for falling behind
+RECONNECT_DELAY_MS = 3000
+
+
+class BookEventFeed:
+    """Server-Sent Events stream of the book events published in this process.
+
+    Idle streams send a comment every `heartbeat_seconds`. It keeps proxies from closing them, and
+    since a closed connection is only noticed when writing, it also ends the subscriptions of
+    clients that went away.
+    """
+
+    def __init__(self, broker: BookEventBroker, heartbeat_seconds: float) -> None:
+        self.broker = broker
+        self.heartbeat_seconds = heartbeat_seconds
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        with self.broker.subscribe() as subscription:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n".encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), self.heartbeat_seconds)
+                except TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Dropped: ending the stream makes the client reconnect, then reload what it shows
+                    return
+                data = BookEventResponse.from_domain(event).model_dump_json()
+                yield f"event: {event.type.value}\ndata: {data}\n\n".encode()
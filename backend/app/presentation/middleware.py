@@ -0,0 +1,81 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructures.database.profiler import QueryProfile, current_profile
+from app.infrastructures.metrics import REQUEST_LATENCY
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording the latency of every HTTP request by route template.
+
+    Labelling by template (`/api/books/{book_id}`) rather than by path keeps the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], route, str(status_code)).observe(time.perf_counter() - start)
+
+
+class QueryProfilerMiddleware:
+    """Counts the SQL statements of each request and warns about statements repeated within one request.
+
+    With `expose_headers`, the query count and database time so far are added to the response headers.
+    """
+
+    def __init__(self, app: ASGIApp, repeated_statement_threshold: int, expose_headers: bool = False) -> None:
+        self.app = app
+        self.repeated_statement_threshold = repeated_statement_threshold
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(profile.count)
+                headers["X-DB-Time-Ms"] = f"{profile.duration * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_profile.reset(token)
+            for statement, count in profile.repeated_statements(self.repeated_statement_threshold):
+                logger.warning(
+                    "Statement executed %d times in %s %s, possible N+1 query: %s",
+                    count,
+                    scope["method"],
+                    scope["path"],
+                    statement,
+                )
@@ -0,0 +1,35 @@
+from collections.abc import Awaitable, Callable, Hashable
+import math
+from typing import Any
+
+import orjson
+
+from app.infrastructures.cache import TTLCache
+from app.infrastructures.metrics import RESPONSE_CACHE_LOOKUPS
+
+
+class ResponseCache:
+    """Serialized JSON bodies of catalog reads, keyed by catalog version and normalized parameters.
+
+    Every write to a book bumps the catalog version, so entries of older versions are never hit
+    again and age out of the LRU; nothing has to be invalidated explicitly, in any process.
+    A `maxsize` of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.cache: TTLCache[tuple[Hashable, ...], bytes] = TTLCache(maxsize, ttl=math.inf)
+
+    async def get_or_render(
+        self, endpoint: str, catalog_version: int, params: tuple[Hashable, ...], render: Callable[[], Awaitable[Any]]
+    ) -> bytes:
+        if self.cache.maxsize == 0:
+            return orjson.dumps(await render())
+        key = (endpoint, catalog_version, *params)
+        body = self.cache.get(key)
+        if body is not None:
+            RESPONSE_CACHE_LOOKUPS.labels(endpoint, "hit").inc()
+            return body
+        RESPONSE_CACHE_LOOKUPS.labels(endpoint, "miss").inc()
+        body = orjson.dumps(await render())
+        self.cache.set(key, body)
+        return body
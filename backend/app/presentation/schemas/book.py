@@ -1,5 +1,11 @@
 from pydantic import BaseModel, Field
 
+from app.domain.models.book import Book
+from app.domain.services.book import BookEvent
+
+# Books per batch borrow or return, enough for a stack checked out at the desk
+MAX_BATCH_SIZE = 50
+
 
 class BookBase(BaseModel):
     title: str
@@ -27,12 +33,65 @@ class BookResponse(BookBase):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_domain(cls, book: Book) -> "BookResponse":
+        return cls(
+            id=book.id.value,
+            title=book.title.value,
+            author=book.author.value,
+            description=book.description.value if book.description else None,
+            category=", ".join([cat.value for cat in book.category]) if book.category else "",
+            status=book.status.value,
+            borrowed_by_id=book.borrowed_by.value if book.borrowed_by else None,
+        )
+
+
+class BookBatchRequest(BaseModel):
+    book_ids: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="IDs of the books")
+
+
+class BookBatchBorrowRequest(BookBatchRequest):
+    user_id: str = Field(..., description="ID of the user borrowing the books")
+
+
+class BookFacetsResponse(BaseModel):
+    categories: dict[str, int] = Field(
+        description="Matching books per category; a book counts in each of its categories"
+    )
+    statuses: dict[str, int] = Field(description="Matching books per status")
+
+
+class BookEventResponse(BaseModel):
+    type: str = Field(..., description="borrowed, returned, updated or deleted")
+    book_id: str
+    book: BookResponse | None = Field(default=None, description="The book after the change; null once deleted")
+
+    @classmethod
+    def from_domain(cls, event: BookEvent) -> "BookEventResponse":
+        return cls(
+            type=event.type.value,
+            book_id=event.book_id.value,
+            book=BookResponse.from_domain(event.book) if event.book else None,
+        )
+
 
 class BookListResponse(BaseModel):
     items: list[BookResponse]
     total: int
     page: int
     limit: int
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to fetch the next page by keyset")
+
+
+class BookImportError(BaseModel):
+    line: int = Field(..., description="Line number in the uploaded file")
+    message: str
+
+
+class BookImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[BookImportError] = Field(..., description="Per-row errors (only the first 1000 are listed)")
 
 
 class BookBorrowRequest(BaseModel):
@@ -1,3 +1,7 @@
+import base64
+import binascii
+import json
+
 from app.domain.models.book import (
     Author,
     Book,
@@ -8,30 +12,30 @@ from app.domain.models.book import (
     Title,
 )
 from app.domain.models.user import Id as UserId
-from app.domain.services.book import IBookRepository
+from app.domain.services.book import (
+    BookEvent,
+    BookEventType,
+    BookFilter,
+    BookRow,
+    IBookEventPublisher,
+    IBookQueryService,
+    IBookRepository,
+)
+from app.domain.services.unit_of_work import IUnitOfWork
 
 
 class BookUseCase:
-    def __init__(self, book_repository: IBookRepository) -> None:
+    def __init__(self, book_repository: IBookRepository, event_publisher: IBookEventPublisher) -> None:
         self.book_repository = book_repository
+        self.event_publisher = event_publisher
 
-    def get_book_by_id(self, book_id: str) -> Book | None:
-        return self.book_repository.find_by_id(BookId(value=book_id))
+    async def get_book_by_id(self, book_id: str) -> Book | None:
+        return await self.book_repository.find_by_id(BookId(value=book_id))
 
-    def get_all_books(self, page: int = 1, limit: int = 10, title: str | None = None) -> list[Book]:
-        # In a real application, we would implement pagination and filtering here
-        books = self.book_repository.find_all()
-
-        # Apply title filter if provided
-        if title:
-            books = [book for book in books if title.lower() in book.title.value.lower()]
+    async def get_book_version(self, book_id: str) -> int | None:
+        return await self.book_repository.find_version(BookId(value=book_id))
 
-        # Apply pagination
-        start = (page - 1) * limit
-        end = start + limit
-        return books[start:end]
-
-    def create_book(
+    async def create_book(
         self,
         title: str,
         author: str,
@@ -44,15 +48,15 @@ class BookUseCase:
             title=Title(value=title),
             author=Author(value=author),
             description=Description(value=description) if description else None,
-            category=self._parse_categories(category),
+            category=parse_categories(category),
             status=BookStatus.AVAILABLE,
         )
 
         # Save the book
-        self.book_repository.save(book)
+        await self.book_repository.save(book)
         return book
 
-    def update_book(
+    async def update_book(
         self,
         book_id: str,
         title: str | None = None,
@@ -61,7 +65,7 @@ class BookUseCase:
         category: str | None = None,
     ) -> Book | None:
         # Get the book
-        book = self.book_repository.find_by_id(BookId(value=book_id))
+        book = await self.book_repository.find_by_id(BookId(value=book_id))
         if not book:
             return None
 
@@ -73,70 +77,169 @@ class BookUseCase:
         if description is not None:  # Allow empty string to clear description
             book.description = Description(value=description) if description else None
         if category:
-            book.category = self._parse_categories(category)
+            book.category = parse_categories(category)
 
-        # Save the book
-        self.book_repository.save(book)
-        return book
+        # Save the book. Its loan may have changed since it was read and is not saved, so the book
+        # is reloaded to return and announce it as stored
+        await self.book_repository.save(book)
+        stored = await self.book_repository.find_by_id(book.id)
+        if stored:
+            self.event_publisher.publish(BookEvent(type=BookEventType.UPDATED, book_id=stored.id, book=stored))
+        return stored
 
-    def delete_book(self, book_id: str) -> bool:
+    async def delete_book(self, book_id: str) -> bool:
         # Get the book
-        book = self.book_repository.find_by_id(BookId(value=book_id))
+        book = await self.book_repository.find_by_id(BookId(value=book_id))
         if not book:
             return False
 
         # Delete the book
-        self.book_repository.delete(BookId(value=book_id))
+        await self.book_repository.delete(book.id)
+        self.event_publisher.publish(BookEvent(type=BookEventType.DELETED, book_id=book.id))
         return True
 
-    def borrow_book(self, book_id: str, user_id: str) -> Book | None:
-        # Get the book
-        book = self.book_repository.find_by_id(BookId(value=book_id))
-        if not book:
-            return None
-
-        # Check if the book is available
-        if not book.is_available:
-            return None
-
-        # Borrow the book
-        book.borrow(UserId(value=user_id))
-
-        # Save the book
-        self.book_repository.save(book)
+    async def borrow_book(self, book_id: str, user_id: str) -> Book | None:
+        # Availability is checked by the repository's conditional update
+        book = await self.book_repository.mark_borrowed(BookId(value=book_id), UserId(value=user_id))
+        if book:
+            self.event_publisher.publish(BookEvent(type=BookEventType.BORROWED, book_id=book.id, book=book))
         return book
 
-    def return_book(self, book_id: str) -> Book | None:
-        # Get the book
-        book = self.book_repository.find_by_id(BookId(value=book_id))
-        if not book:
-            return None
-
-        # Check if the book is borrowed
-        if book.status != BookStatus.BORROWED:
-            return None
+    async def return_book(self, book_id: str, borrower_id: str | None = None) -> Book | None:
+        # Only return the book if it is borrowed (by `borrower_id`, when given)
+        book = await self.book_repository.mark_returned(
+            BookId(value=book_id), UserId(value=borrower_id) if borrower_id else None
+        )
+        if book:
+            self.event_publisher.publish(BookEvent(type=BookEventType.RETURNED, book_id=book.id, book=book))
+        return book
 
-        # Return the book
-        book.return_book()
 
-        # Save the book
-        self.book_repository.save(book)
-        return book
+class BookLoanUseCase:
+    """Borrows or returns a batch of books in one transaction: either every book changes hands or none does."""
+
+    def __init__(self, unit_of_work: IUnitOfWork, event_publisher: IBookEventPublisher) -> None:
+        self.unit_of_work = unit_of_work
+        self.event_publisher = event_publisher
+
+    async def borrow_books(self, book_ids: list[str], user_id: str) -> tuple[list[Book], list[str]]:
+        """Return the borrowed books in request order, or no books and the ids that could not be borrowed."""
+        unique_ids = list(dict.fromkeys(book_ids))
+        async with self.unit_of_work as uow:
+            books = await uow.books.mark_many_borrowed(
+                [BookId(value=book_id) for book_id in unique_ids], UserId(value=user_id)
+            )
+            borrowed, failed = await self._commit_if_complete(uow, unique_ids, books)
+        self._publish(BookEventType.BORROWED, borrowed)
+        return borrowed, failed
+
+    async def return_books(self, book_ids: list[str], borrower_id: str | None = None) -> tuple[list[Book], list[str]]:
+        """Like `borrow_books`; only books held by `borrower_id`, when given, can be returned."""
+        unique_ids = list(dict.fromkeys(book_ids))
+        async with self.unit_of_work as uow:
+            books = await uow.books.mark_many_returned(
+                [BookId(value=book_id) for book_id in unique_ids], UserId(value=borrower_id) if borrower_id else None
+            )
+            returned, failed = await self._commit_if_complete(uow, unique_ids, books)
+        self._publish(BookEventType.RETURNED, returned)
+        return returned, failed
+
+    def _publish(self, event_type: BookEventType, books: list[Book]) -> None:
+        # Empty unless the batch was committed
+        for book in books:
+            self.event_publisher.publish(BookEvent(type=event_type, book_id=book.id, book=book))
+
+    @staticmethod
+    async def _commit_if_complete(
+        uow: IUnitOfWork, book_ids: list[str], books: list[Book]
+    ) -> tuple[list[Book], list[str]]:
+        updated = {book.id.value: book for book in books}
+        failed = [book_id for book_id in book_ids if book_id not in updated]
+        if failed:
+            # Leaving the unit of work without committing rolls back the books that were updated
+            return [], failed
+        await uow.commit()
+        return [updated[book_id] for book_id in book_ids], []
+
+
+class BookQueryUseCase:
+    """Read-only listings served from projected rows rather than `Book` entities."""
+
+    def __init__(self, book_queries: IBookQueryService) -> None:
+        self.book_queries = book_queries
+
+    async def get_all_books(self, page: int = 1, limit: int = 10, filters: BookFilter | None = None) -> list[BookRow]:
+        # Filtering and pagination are pushed down to the query service
+        return await self.book_queries.find_page(
+            offset=(page - 1) * limit, limit=limit, filters=filters or BookFilter()
+        )
 
-    def _parse_categories(self, category_str: str) -> list[Category]:
-        """Parse a comma-separated string of categories into a list of Category enums."""
-        categories = []
-        for cat in category_str.split(","):
-            category = cat.strip()
-            if not category:
-                continue
-            try:
-                categories.append(Category(category))
-            except ValueError:
-                categories.append(Category.OTHER)
-
-        # If no valid categories were found, default to OTHER
-        if not categories:
-            categories.append(Category.OTHER)
-
-        return categories
+    async def get_books_after(
+        self, cursor: str | None, limit: int = 10, filters: BookFilter | None = None
+    ) -> tuple[list[BookRow], str | None]:
+        """Keyset pagination: return the page following `cursor` and the cursor of the next page."""
+        after = _decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to know whether another page exists
+        books = await self.book_queries.find_after(limit=limit + 1, after=after, filters=filters or BookFilter())
+        next_cursor = encode_cursor(books[limit - 1]) if len(books) > limit else None
+        return books[:limit], next_cursor
+
+    async def count_books(self, filters: BookFilter | None = None) -> int:
+        return await self.book_queries.count(filters or BookFilter())
+
+    async def get_facets(self, filters: BookFilter | None = None) -> dict[str, dict[str, int]]:
+        """Count the matching books per category and per status, listing values without books as 0."""
+        categories = await self.book_queries.count_by_category(filters or BookFilter())
+        statuses = await self.book_queries.count_by_status(filters or BookFilter())
+        return {
+            "categories": {category.value: categories.get(category.value, 0) for category in Category},
+            "statuses": {status.value: statuses.get(status.value, 0) for status in BookStatus},
+        }
+
+    async def search_books(self, query: str, page: int = 1, limit: int = 10) -> list[BookRow]:
+        return await self.book_queries.search(query, offset=(page - 1) * limit, limit=limit)
+
+    async def count_search_results(self, query: str) -> int:
+        return await self.book_queries.count_search(query)
+
+    async def get_catalog_version(self) -> int:
+        return await self.book_queries.catalog_version()
+
+
+def parse_categories(category_str: str) -> list[Category]:
+    """Parse a comma-separated string of categories into a list of distinct Category enums."""
+    categories: list[Category] = []
+    for cat in category_str.split(","):
+        category = cat.strip()
+        if not category:
+            continue
+        try:
+            parsed = Category(category)
+        except ValueError:
+            parsed = Category.OTHER
+        if parsed not in categories:
+            categories.append(parsed)
+
+    # If no valid categories were found, default to OTHER
+    if not categories:
+        categories.append(Category.OTHER)
+
+    return categories
+
+
+def encode_cursor(book: BookRow) -> str:
+    """Encode the (title, id) sort key of `book` as an opaque pagination cursor."""
+    raw = json.dumps([book["title"], book["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    match decoded:
+        case [str() as title, str() as book_id]:
+            return title, book_id
+        case _:
+            raise ValueError("Invalid cursor")
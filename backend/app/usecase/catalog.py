@@ -0,0 +1,142 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.domain.models.book import (
+    Author,
+    Book,
+    BookStatus,
+    Description,
+    Id as BookId,
+    Title,
+)
+from app.domain.services.unit_of_work import IUnitOfWork
+from app.usecase.book import parse_categories
+
+# Rows per transaction; large enough to amortize the commit, small enough to bound memory
+IMPORT_CHUNK_SIZE = 5000
+# Rows per insert statement; building a statement holds the event loop, so a chunk is inserted in batches
+IMPORT_BATCH_SIZE = 500
+# Rows fetched per round trip and emitted per chunk when exporting
+EXPORT_BATCH_SIZE = 1000
+# Only the first errors are reported so a badly broken file cannot exhaust memory
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(BaseModel):
+    line: int
+    message: str
+
+
+class ImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[RowError] = []
+
+
+class CatalogUseCase:
+    def __init__(self, unit_of_work: IUnitOfWork) -> None:
+        self.unit_of_work = unit_of_work
+
+    async def import_books(
+        self,
+        records: Iterable[tuple[int, dict[str, Any] | None]],
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ) -> ImportReport:
+        """Validate and insert records chunk by chunk, committing each chunk in one transaction.
+
+        Books whose id already exists are left untouched and reported as errors, so importing an export
+        again cannot undo the loans made since.
+        """
+        report = ImportReport()
+        records = iter(records)
+        async with self.unit_of_work as uow:
+            while True:
+                # Reading, parsing and validating a chunk is CPU-bound, so it runs off the event loop
+                chunk, exhausted = await asyncio.to_thread(self._read_chunk, records, chunk_size, report)
+                if chunk:
+                    await self._insert_chunk(uow, chunk, report)
+                if exhausted:
+                    break
+        return report
+
+    def _read_chunk(
+        self, records: Iterator[tuple[int, dict[str, Any] | None]], chunk_size: int, report: ImportReport
+    ) -> tuple[list[tuple[int, Book]], bool]:
+        """Validate records until a chunk is full; also return whether the records are exhausted."""
+        chunk: list[tuple[int, Book]] = []
+        for line, record in records:
+            try:
+                chunk.append((line, self._to_book(record)))
+            except ValueError as e:
+                self._record_error(report, line, e)
+                continue
+            if len(chunk) >= chunk_size:
+                return chunk, False
+        return chunk, True
+
+    async def _insert_chunk(self, uow: IUnitOfWork, chunk: list[tuple[int, Book]], report: ImportReport) -> None:
+        books = [book for _, book in chunk]
+        inserted: set[str] = set()
+        for start in range(0, len(books), IMPORT_BATCH_SIZE):
+            new_ids = await uow.books.insert_new(books[start : start + IMPORT_BATCH_SIZE])
+            inserted.update(book_id.value for book_id in new_ids)
+        await uow.commit()
+        for line, book in chunk:
+            if book.id.value in inserted:
+                # A later row repeating the id was not inserted
+                inserted.discard(book.id.value)
+                report.imported += 1
+            else:
+                self._record_error(report, line, ValueError(f"Book already exists: {book.id.value}"))
+
+    async def export_books(self, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[list[dict[str, Any]]]:
+        """Stream the whole catalog as batches of plain records, holding at most one batch in memory."""
+        batch: list[dict[str, Any]] = []
+        async with self.unit_of_work as uow:
+            async for book in uow.books.stream_all(batch_size):
+                batch.append(self._to_record(book))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _to_record(self, book: Book) -> dict[str, Any]:
+        return {
+            "id": book.id.value,
+            "title": book.title.value,
+            "author": book.author.value,
+            "description": book.description.value if book.description else None,
+            "category": ", ".join(cat.value for cat in book.category),
+            "status": book.status.value,
+            "borrowed_by_id": book.borrowed_by.value if book.borrowed_by else None,
+        }
+
+    def _to_book(self, record: dict[str, Any] | None) -> Book:
+        if record is None:
+            raise ValueError("Malformed record")
+        for field in ("id", "title", "author", "description", "category"):
+            if record.get(field) is not None and not isinstance(record[field], str):
+                raise ValueError(f"Field must be a string: {field}")
+        for field in ("title", "author"):
+            if not record.get(field):
+                raise ValueError(f"Missing required field: {field}")
+
+        description = record.get("description")
+        return Book(
+            id=BookId(value=record["id"]) if record.get("id") else BookId.generate(),
+            title=Title(value=record["title"]),
+            author=Author(value=record["author"]),
+            description=Description(value=description) if description else None,
+            category=parse_categories(record.get("category") or ""),
+            status=BookStatus.AVAILABLE,
+        )
+
+    def _record_error(self, report: ImportReport, line: int, error: ValueError) -> None:
+        report.failed += 1
+        if len(report.errors) >= MAX_REPORTED_ERRORS:
+            return
+        report.errors.append(RowError(line=line, message=str(error)))
@@ -7,26 +7,40 @@ from app.domain.models.user import (
     User,
 )
 from app.domain.services.book import IBookRepository
+from app.domain.services.password import IPasswordHasher
 from app.domain.services.user import IUserRepository
 
 
 class UserUseCase:
-    def __init__(self, user_repository: IUserRepository, book_repository: IBookRepository) -> None:
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        book_repository: IBookRepository,
+        password_hasher: IPasswordHasher,
+        user_reader: IUserRepository | None = None,
+    ) -> None:
         self.user_repository = user_repository
         self.book_repository = book_repository
+        self.password_hasher = password_hasher
+        # Lookups followed by a password check, which is slow; they should not hold a connection
+        # the writes of other requests need
+        self.user_reader = user_reader or user_repository
 
-    def get_user_by_id(self, user_id: str) -> User | None:
-        return self.user_repository.find_by_id(UserId(value=user_id))
+    async def get_user_by_id(self, user_id: str) -> User | None:
+        return await self.user_repository.find_by_id(UserId(value=user_id))
 
-    def get_user_by_email(self, email: str) -> User | None:
-        return self.user_repository.find_by_email(Email(value=email))
+    async def get_user_by_email(self, email: str) -> User | None:
+        return await self.user_repository.find_by_email(Email(value=email))
 
-    def get_all_users(self) -> list[User]:
-        return self.user_repository.find_all()
+    async def get_all_users(self) -> list[User]:
+        return await self.user_repository.find_all()
+
+    async def create_user(self, name: str, email: str, password: str, is_admin: bool = False) -> User:
+        # Hash the password first, so the lookup and the save below follow each other closely
+        password_hash = await self.password_hasher.hash(password)
 
-    def create_user(self, name: str, email: str, password: str, is_admin: bool = False) -> User:
         # Check if user with email already exists
-        existing_user = self.user_repository.find_by_email(Email(value=email))
+        existing_user = await self.user_repository.find_by_email(Email(value=email))
         if existing_user:
             raise ValueError(f"User with email {email} already exists")
 
@@ -35,61 +49,62 @@ class UserUseCase:
             id=UserId.generate(),
             name=Name(value=name),
             email=Email(value=email),
-            password=Password(value=password),  # In a real app, we would hash the password
+            password=Password(value=password_hash),
             is_admin=is_admin,
         )
 
         # Save the user
-        self.user_repository.save(user)
+        await self.user_repository.save(user)
         return user
 
-    def update_user(
+    async def update_user(
         self, user_id: str, name: str | None = None, password: str | None = None, is_admin: bool | None = None
     ) -> User | None:
+        # Hash the password first, so the lookup and the save below follow each other closely
+        password_hash = await self.password_hasher.hash(password) if password else None
+
         # Get the user
-        user = self.user_repository.find_by_id(UserId(value=user_id))
+        user = await self.user_repository.find_by_id(UserId(value=user_id))
         if not user:
             return None
 
         # Update the user
         if name:
             user.name = Name(value=name)
-        if password:
-            user.password = Password(value=password)  # In a real app, we would hash the password
+        if password_hash:
+            user.password = Password(value=password_hash)
         if is_admin is not None:
             user.is_admin = is_admin
 
         # Save the user
-        self.user_repository.save(user)
+        await self.user_repository.save(user)
         return user
 
-    def delete_user(self, user_id: str) -> bool:
+    async def delete_user(self, user_id: str) -> bool:
         # Get the user
-        user = self.user_repository.find_by_id(UserId(value=user_id))
+        user = await self.user_repository.find_by_id(UserId(value=user_id))
         if not user:
             return False
 
         # Delete the user
-        self.user_repository.delete(UserId(value=user_id))
+        await self.user_repository.delete(UserId(value=user_id))
         return True
 
-    def authenticate_user(self, email: str, password: str) -> User | None:
+    async def authenticate_user(self, email: str, password: str) -> User | None:
         # Get the user
-        user = self.user_repository.find_by_email(Email(value=email))
-        if not user:
-            return None
+        user = await self.user_reader.find_by_email(Email(value=email))
 
-        # Check the password (in a real app, we would verify the hash)
-        if user.password.value != password:
+        # Check the password; unknown emails are checked too so both cases take as long
+        valid, new_hash = await self.password_hasher.verify(password, user.password.value if user else None)
+        if not user or not valid:
             return None
 
-        return user
-
-    def get_user_books(self, user_id: str) -> list[BookId]:
-        # Get all books
-        books = self.book_repository.find_all()
+        # Upgrade plaintext passwords and hashes made with outdated parameters
+        if new_hash is not None:
+            user.password = Password(value=new_hash)
+            await self.user_repository.save(user)
 
-        # Filter books borrowed by the user
-        user_books = [book.id for book in books if book.borrowed_by and book.borrowed_by.value == user_id]
+        return user
 
-        return user_books
+    async def get_user_books(self, user_id: str) -> list[BookId]:
+        return await self.book_repository.find_ids_by_borrower(UserId(value=user_id))
@@ -0,0 +1,258 @@
+"""Drive the API in process against a seeded temporary database and report latency percentiles.
+
+The catalog grows through each requested size, and every scenario is run at each size. Run from the
+backend directory:
+
+    python -m benchmarks.api [--books 1000 10000] [--users 50] [--requests 200] [--concurrency 8]
+
+The settings of the app (cache, SQLite profile, ...) are taken from the environment as usual, except
+DATABASE_URL, which always points to a temporary database.
+"""
+
+# The app is imported inside functions, once DATABASE_URL points to the temporary database
+# ruff: noqa: PLC0415, S311
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+import os
+from pathlib import Path
+import random
+import statistics
+import tempfile
+import time
+from typing import Any
+
+import httpx
+
+WORDS = (
+    "python", "deep", "learning", "machine", "vision", "language", "model", "data", "systems", "design",
+    "patterns", "practical", "introduction", "advanced", "guide", "handbook", "theory", "statistics",
+    "networks", "graphs", "algorithms", "cloud",
+)  # fmt: skip
+CATEGORIES = ["Python", "Deep Learning", "Machine Learning", "Other"]
+PASSWORD = "benchmark-password"
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+def _book_records(rng: random.Random, start: int, stop: int) -> Iterator[tuple[int, dict[str, Any]]]:
+    for number in range(start, stop):
+        yield (
+            number,
+            {
+                "title": " ".join(rng.choices(WORDS, k=3)).title() + f" {number}",
+                "author": f"Author {rng.randrange(500)}",
+                "description": " ".join(rng.choices(WORDS, k=12)),
+                "category": ", ".join(rng.sample(CATEGORIES, rng.randint(1, 2))),
+            },
+        )
+
+
+async def _seed_users(count: int) -> list[str]:
+    from app.domain.models.user import Email, Id, Name, Password, User
+    from app.infrastructures.database.connection import AsyncSessionLocal
+    from app.infrastructures.database.unit_of_work import UnitOfWork
+    from app.presentation.dependencies import password_hasher
+
+    # Every user shares one password, so it is hashed only once
+    password_hash = await password_hasher.hash(PASSWORD)
+    user_ids = [Id.generate() for _ in range(count)]
+    async with UnitOfWork(AsyncSessionLocal()) as uow:
+        for number, user_id in enumerate(user_ids):
+            await uow.users.save(
+                User(
+                    id=user_id,
+                    name=Name(value=f"User {number}"),
+                    email=Email(value=f"user{number}@example.com"),
+                    password=Password(value=password_hash),
+                    is_admin=number == 0,
+                )
+            )
+        await uow.commit()
+    return [user_id.value for user_id in user_ids]
+
+
+async def _seed_books(rng: random.Random, start: int, stop: int) -> None:
+    from app.infrastructures.database.connection import AsyncSessionLocal
+    from app.infrastructures.database.unit_of_work import UnitOfWork
+    from app.usecase.catalog import CatalogUseCase
+
+    await CatalogUseCase(UnitOfWork(AsyncSessionLocal())).import_books(_book_records(rng, start, stop))
+
+
+async def _book_ids() -> list[str]:
+    from sqlalchemy import select
+
+    from app.infrastructures.database.connection import ReadSessionLocal
+    from app.infrastructures.database.models import BookModel
+
+    async with ReadSessionLocal() as session:
+        return list(await session.scalars(select(BookModel.id).order_by(BookModel.id)))
+
+
+async def _measure(
+    client: httpx.AsyncClient, request: Request, rng: random.Random, requests: int, concurrency: int
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(worker_rng: random.Random) -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await request(client, worker_rng)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400  # noqa: PLR2004
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(rng.random())) for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _scenarios(user_ids: list[str], tokens: list[str], book_ids: list[str]) -> dict[str, Request]:  # noqa: C901
+    def auth(index: int) -> dict[str, str]:
+        return {"Authorization": f"Bearer {tokens[index]}"}
+
+    async def login(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        number = rng.randrange(len(user_ids))
+        return await client.post(
+            "/api/users/login", data={"username": f"user{number}@example.com", "password": PASSWORD}
+        )
+
+    async def list_books(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        page = rng.randrange(1, max(len(book_ids) // 20, 1) + 1)
+        return await client.get("/api/books", params={"page": page, "limit": 20})
+
+    async def first_page(client: httpx.AsyncClient, _rng: random.Random) -> httpx.Response:
+        return await client.get("/api/books", params={"page": 1, "limit": 10})
+
+    async def filter_books(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/books", params={"title": rng.choice(WORDS), "limit": 20})
+
+    async def filter_by_category(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(
+            "/api/books", params={"category": rng.choice(CATEGORIES), "status": "available", "limit": 20}
+        )
+
+    async def facets(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/books/facets", params={"author": f"Author {rng.randrange(500)}"})
+
+    async def search_books(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/books/search", params={"q": " ".join(rng.sample(WORDS, 2)), "limit": 20})
+
+    async def get_book(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/api/books/{rng.choice(book_ids)}")
+
+    # `*` matches any current version, so these take the 304 path after the version lookup
+
+    async def revalidate_list(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        page = rng.randrange(1, max(len(book_ids) // 20, 1) + 1)
+        return await client.get("/api/books", params={"page": page, "limit": 20}, headers={"If-None-Match": "*"})
+
+    async def revalidate_book(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/api/books/{rng.choice(book_ids)}", headers={"If-None-Match": "*"})
+
+    async def borrow_and_return(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        index = rng.randrange(len(tokens))
+        book_id = rng.choice(book_ids)
+        response = await client.post(
+            f"/api/books/{book_id}/borrow", json={"user_id": user_ids[index]}, headers=auth(index)
+        )
+        if response.is_success:
+            response = await client.post(f"/api/books/{book_id}/return", headers=auth(index))
+        return response
+
+    async def batch_borrow_and_return(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        index = rng.randrange(len(tokens))
+        ids = rng.sample(book_ids, 10)
+        response = await client.post(
+            "/api/books/borrow", json={"user_id": user_ids[index], "book_ids": ids}, headers=auth(index)
+        )
+        if response.is_success:
+            response = await client.post("/api/books/return", json={"book_ids": ids}, headers=auth(index))
+        return response
+
+    async def user_books(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        index = rng.randrange(len(tokens))
+        return await client.get(f"/api/users/{user_ids[index]}/books", headers=auth(index))
+
+    return {
+        "login": login,
+        "list": list_books,
+        "list (first page)": first_page,
+        "list (title filter)": filter_books,
+        "list (category + status filter)": filter_by_category,
+        "facets (author filter)": facets,
+        "search": search_books,
+        "detail": get_book,
+        "list (304)": revalidate_list,
+        "detail (304)": revalidate_book,
+        "borrow + return": borrow_and_return,
+        "batch borrow + return (10 books)": batch_borrow_and_return,
+        "user books": user_books,
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.app import app
+    from app.infrastructures.database.connection import dispose_engines, engine
+    from app.infrastructures.database.migrations import migrate
+
+    migrate(engine)
+    rng = random.Random(args.seed)
+    user_ids = await _seed_users(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Tokens of a handful of users, the first being an admin
+        tokens = [
+            (
+                await client.post(
+                    "/api/users/login", data={"username": f"user{number}@example.com", "password": PASSWORD}
+                )
+            ).json()["access_token"]
+            for number in range(min(args.users, 10))
+        ]
+
+        print("| books | scenario | requests | req/s | p50 ms | p95 ms | p99 ms | errors |")
+        print("|---:|---|---:|---:|---:|---:|---:|---:|")
+        seeded = 0
+        for size in sorted(args.books):
+            await _seed_books(rng, seeded, size)
+            seeded = size
+            book_ids = await _book_ids()
+            for name, request in _scenarios(user_ids, tokens, book_ids).items():
+                # Warm up caches and connection pools before measuring
+                await _measure(client, request, rng, args.concurrency, args.concurrency)
+                latencies, errors, elapsed = await _measure(client, request, rng, args.requests, args.concurrency)
+                p50, p95, p99 = (q * 1000 for q in _percentiles(latencies))
+                print(
+                    f"| {size:,} | {name} | {len(latencies)} | {len(latencies) / elapsed:,.0f} "
+                    f"| {p50:.1f} | {p95:.1f} | {p99:.1f} | {errors} |"
+                )
+    await dispose_engines()
+
+
+def _percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, nargs="+", default=[1000, 10000], help="Catalog sizes to measure")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Must be set before the app is imported: the engines are created at import time
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(directory) / 'benchmark.db'}"
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
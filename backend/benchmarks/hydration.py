@@ -0,0 +1,109 @@
+"""Measure the cost of turning ORM rows into domain entities.
+
+Compares building every value object separately, as the repositories used to, with their current
+single-call hydration. Run from the backend directory:
+
+    python -m benchmarks.hydration [--rows 100000]
+"""
+
+import argparse
+from collections.abc import Callable
+import time
+from typing import Any
+import uuid
+
+from app.domain.models.book import (
+    Author,
+    Book,
+    BookStatus,
+    Category,
+    Description,
+    Id as BookId,
+    Title,
+)
+from app.domain.models.user import (
+    Email,
+    Id as UserId,
+    Name,
+    Password,
+    User,
+)
+from app.infrastructures.database.database import BookRepository, UserRepository
+from app.infrastructures.database.models import BookModel, UserModel
+
+
+def _previous_book(record: BookModel) -> Book:
+    borrowed_by = UserId(value=str(record.borrowed_by_id)) if record.borrowed_by_id else None
+    return Book(
+        id=BookId(value=record.id),
+        title=Title(value=record.title),
+        author=Author(value=record.author),
+        description=Description(value=record.description) if record.description else None,
+        category=[Category(category) for category in record.category.split(", ")],
+        status=BookStatus(record.status),
+        borrowed_by=borrowed_by,
+        version=record.version,
+    )
+
+
+def _previous_user(record: UserModel) -> User:
+    return User(
+        id=UserId(value=record.id),
+        name=Name(value=record.name),
+        email=Email(value=record.email),
+        password=Password(value=record.password),
+        is_admin=record.is_admin,
+    )
+
+
+def _per_row(to_domain: Callable[[Any], object], records: list[Any]) -> float:
+    start = time.perf_counter()
+    for record in records:
+        to_domain(record)
+    return (time.perf_counter() - start) / len(records) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    books = [
+        BookModel(
+            id=str(uuid.uuid4()),
+            title=f"Book {i}",
+            author="Author",
+            description="A description",
+            category=Category.PYTHON.value,
+            status=BookStatus.BORROWED.value if i % 2 else BookStatus.AVAILABLE.value,
+            borrowed_by_id=str(uuid.uuid4()) if i % 2 else None,
+            version=1,
+        )
+        for i in range(args.rows)
+    ]
+    users = [
+        UserModel(
+            id=str(uuid.uuid4()),
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            password="x",  # noqa: S106
+            is_admin=False,
+        )
+        for i in range(args.rows)
+    ]
+    book_repository = BookRepository.__new__(BookRepository)
+    user_repository = UserRepository.__new__(UserRepository)
+
+    print("| entity | before (µs/row) | after (µs/row) | speedup |")
+    print("|---|---:|---:|---:|")
+    for name, previous, current, records in (
+        ("Book", _previous_book, book_repository._to_domain, books),  # noqa: SLF001
+        ("User", _previous_user, user_repository._to_domain, users),  # noqa: SLF001
+    ):
+        before = _per_row(previous, records)
+        after = _per_row(current, records)
+        print(f"| {name} | {before:.2f} | {after:.2f} | {before / after:.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare SQLite connection profiles on a write-heavy and a mixed read/write workload.
+
+Run from the backend directory:
+
+    python -m benchmarks.sqlite_profiles [--seconds 5] [--readers 4]
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import AsyncAdaptedQueuePool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import SqliteProfile
+from app.domain.models.book import Author, Book, Category, Id, Title
+from app.infrastructures.database.connection import configure_sqlite
+from app.infrastructures.database.database import BookRepository
+from app.infrastructures.database.migrations import migrate
+
+SEED_BOOKS = 10000
+
+
+def _book(book_id: str | None = None) -> Book:
+    return Book(
+        id=Id(value=book_id or str(uuid.uuid4())),
+        title=Title(value=f"Benchmark {uuid.uuid4().hex[:8]}"),
+        author=Author(value="Benchmark"),
+        category=[Category.OTHER],
+    )
+
+
+async def _run(path: Path, profile: SqliteProfile, seconds: float, readers: int) -> tuple[float, float, float]:
+    engine = create_engine(f"sqlite:///{path}")
+    configure_sqlite(engine, profile)
+    migrate(engine)
+    engine.dispose()
+
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=readers + 1
+    )
+    configure_sqlite(async_engine.sync_engine, profile)
+    sessions = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    ids = [str(uuid.uuid4()) for _ in range(SEED_BOOKS)]
+    async with sessions() as session:
+        repository = BookRepository(session, autocommit=False)
+        for book_id in ids:
+            await repository.save(_book(book_id))
+        await repository.flush_pending()
+        await session.commit()
+
+    # Write-only: one commit per saved book
+    async with sessions() as session:
+        repository = BookRepository(session)
+        commits = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            await repository.save(_book())
+            commits += 1
+    write_rate = commits / seconds
+
+    # Mixed: one committing writer while readers look books up by id
+    counts = {"reads": 0, "writes": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def write() -> None:
+        async with sessions() as session:
+            repository = BookRepository(session)
+            while time.perf_counter() < deadline:
+                await repository.save(_book())
+                counts["writes"] += 1
+
+    async def read(offset: int) -> None:
+        async with sessions() as session:
+            repository = BookRepository(session)
+            index = offset
+            while time.perf_counter() < deadline:
+                await repository.find_by_id(Id(value=ids[index % SEED_BOOKS]))
+                # End the read transaction so each lookup sees the latest commit
+                await session.rollback()
+                counts["reads"] += 1
+                index += readers
+
+    await asyncio.gather(write(), *(read(offset) for offset in range(readers)))
+    await async_engine.dispose()
+    return write_rate, counts["reads"] / seconds, counts["writes"] / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each workload")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent readers in the mixed workload")
+    args = parser.parse_args()
+
+    print("| profile | commits/s (write only) | reads/s (mixed) | commits/s (mixed) |")
+    print("|---|---:|---:|---:|")
+    for profile in SqliteProfile:
+        with tempfile.TemporaryDirectory() as directory:
+            write_rate, read_rate, mixed_write_rate = asyncio.run(
+                _run(Path(directory) / "benchmark.db", profile, args.seconds, args.readers)
+            )
+        print(f"| {profile.value} | {write_rate:,.0f} | {read_rate:,.0f} | {mixed_write_rate:,.0f} |")
+
+
+if __name__ == "__main__":
+    main()
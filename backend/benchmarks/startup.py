@@ -0,0 +1,65 @@
+"""Measure how long a fresh process takes to import the app module and run its startup.
+
+Each run is a new interpreter against a migrated temporary database, as for a worker being spawned or
+reloaded. Exits with status 1 when the median exceeds the budget. Run from the backend directory:
+
+    python -m benchmarks.startup [--runs 10] [--budget-ms 1500]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Prints the import time and the lifespan startup time in milliseconds
+_PROBE = """
+import asyncio, time
+start = time.perf_counter()
+from app.app import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(startup())
+print((imported - start) * 1000, (ready - imported) * 1000)
+"""
+
+
+def _probe(environ: dict[str, str]) -> tuple[float, float]:
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", _PROBE], env=environ, check=True, capture_output=True, text=True
+    ).stdout
+    import_ms, startup_ms = output.split()
+    return float(import_ms), float(startup_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Budget for the median import + startup")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        environ = {**os.environ, "DATABASE_URL": f"sqlite:///{Path(directory) / 'startup.db'}"}
+        subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=environ, check=True, capture_output=True)
+        # The first run warms the bytecode and OS file caches
+        _probe(environ)
+        runs = [_probe(environ) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run[0] for run in runs)
+    startup_ms = statistics.median(run[1] for run in runs)
+    total_ms = statistics.median(sum(run) for run in runs)
+    print(f"import {import_ms:.0f} ms, startup {startup_ms:.0f} ms, total {total_ms:.0f} ms (median of {args.runs})")
+    if total_ms > args.budget_ms:
+        print(f"Over the budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
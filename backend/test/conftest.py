@@ -0,0 +1,122 @@
+# The engines are created when `app` is first imported, so DATABASE_URL is set before any app import
+# ruff: noqa: E402
+
+import os
+from pathlib import Path
+import tempfile
+
+_database_directory = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_database_directory.name) / 'test.db'}"
+
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.app import app as application
+from app.domain.models.book import (
+    Author,
+    Book,
+    BookStatus,
+    Category,
+    Id as BookId,
+    Title,
+)
+from app.domain.models.user import (
+    Email,
+    Id as UserId,
+    Name,
+    Password,
+    User,
+)
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal, dispose_engines, engine
+from app.infrastructures.database.migrations import migrate
+from app.infrastructures.database.models import BookModel
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.presentation.dependencies import create_access_token
+
+# Every table holding rows, children first; migrations only run once
+_TABLES = ("book_categories", "books_fts", "books", "users")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema() -> Iterator[None]:
+    migrate(engine)
+    yield
+    engine.dispose()
+    _database_directory.cleanup()
+
+
+@pytest.fixture(autouse=True)
+async def database(schema: None) -> AsyncIterator[None]:
+    yield
+    # Pooled aiosqlite connections are bound to the event loop of the test that opened them
+    await dispose_engines()
+    with engine.begin() as connection:
+        for table in _TABLES:
+            connection.exec_driver_sql(f"DELETE FROM {table}")  # noqa: S608
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    # Requests go straight to the application, sharing its process-wide caches with the test
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=application), base_url="http://test") as client:
+        yield client
+
+
+def auth_headers(user_id: UserId, *, is_admin: bool = False) -> dict[str, str]:
+    token = create_access_token({"sub": user_id.value, "email": "user@example.com", "is_admin": is_admin})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def add_users(count: int) -> list[UserId]:
+    users = [
+        User(
+            id=UserId.generate(),
+            name=Name(value=f"User {number}"),
+            email=Email(value=f"user{number}@example.com"),
+            password=Password(value="hash"),
+            is_admin=False,
+        )
+        for number in range(count)
+    ]
+    async with UnitOfWork(AsyncSessionLocal()) as uow:
+        for user in users:
+            await uow.users.save(user)
+        await uow.commit()
+    return [user.id for user in users]
+
+
+async def add_books(count: int) -> list[BookId]:
+    books = [
+        Book(
+            id=BookId.generate(),
+            title=Title(value=f"Book {number}"),
+            author=Author(value="Author"),
+            category=[Category.PYTHON],
+            status=BookStatus.AVAILABLE,
+        )
+        for number in range(count)
+    ]
+    async with UnitOfWork(AsyncSessionLocal()) as uow:
+        for book in books:
+            await uow.books.save(book)
+        await uow.commit()
+    return [book.id for book in books]
+
+
+async def stored_loans(book_ids: list[BookId]) -> dict[str, tuple[str, str | None]]:
+    """Status and borrower of each book as stored, read on a fresh connection."""
+    async with ReadSessionLocal() as session:
+        rows = await session.execute(
+            select(BookModel.id, BookModel.status, BookModel.borrowed_by_id).where(
+                BookModel.id.in_([book_id.value for book_id in book_ids])
+            )
+        )
+        return {book_id: (status, borrowed_by_id) for book_id, status, borrowed_by_id in rows.tuples()}
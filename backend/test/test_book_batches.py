@@ -0,0 +1,143 @@
+import asyncio
+
+from conftest import add_books, add_users, stored_loans
+import pytest
+
+from app.domain.models.book import (
+    Book,
+    BookStatus,
+    Id as BookId,
+)
+from app.domain.models.user import Id as UserId
+from app.infrastructures.cache import CachedBookRepository, TTLCache
+from app.infrastructures.database.connection import AsyncSessionLocal
+from app.infrastructures.database.database import BookRepository
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.infrastructures.events import BookEventBroker
+from app.usecase.book import BookLoanUseCase
+
+pytestmark = pytest.mark.anyio
+
+
+async def borrow_all(
+    book_ids: list[str],
+    user_id: UserId,
+    cache: TTLCache[str, Book] | None = None,
+    broker: BookEventBroker | None = None,
+) -> tuple[list[Book], list[str]]:
+    async with AsyncSessionLocal() as session:
+        usecase = BookLoanUseCase(UnitOfWork(session, book_cache=cache), broker or BookEventBroker(100))
+        return await usecase.borrow_books(book_ids, user_id.value)
+
+
+async def return_all(
+    book_ids: list[str], borrower_id: UserId | None = None, cache: TTLCache[str, Book] | None = None
+) -> tuple[list[Book], list[str]]:
+    async with AsyncSessionLocal() as session:
+        usecase = BookLoanUseCase(UnitOfWork(session, book_cache=cache), BookEventBroker(100))
+        return await usecase.return_books(book_ids, borrower_id.value if borrower_id else None)
+
+
+async def cached_statuses(cache: TTLCache[str, Book], book_ids: list[BookId]) -> list[BookStatus]:
+    """Statuses as read through the cache, filling it on a miss."""
+    async with AsyncSessionLocal() as session:
+        repository = CachedBookRepository(BookRepository(session), cache)
+        books = [await repository.find_by_id(book_id) for book_id in book_ids]
+    return [book.status for book in books if book]
+
+
+async def test_batch_borrow_lends_every_book() -> None:
+    book_ids = await add_books(3)
+    [user] = await add_users(1)
+
+    borrowed, failed = await borrow_all([book_id.value for book_id in book_ids], user)
+
+    assert failed == []
+    assert [book.id for book in borrowed] == book_ids
+    assert await stored_loans(book_ids) == {book_id.value: ("borrowed", user.value) for book_id in book_ids}
+
+
+async def test_batch_borrow_with_one_borrowed_book_changes_nothing() -> None:
+    book_ids = await add_books(3)
+    holder, user = await add_users(2)
+    await borrow_all([book_ids[1].value], holder)
+    broker = BookEventBroker(100)
+
+    with broker.subscribe() as events:
+        borrowed, failed = await borrow_all([book_id.value for book_id in book_ids], user, broker=broker)
+        assert events.queue.empty()
+
+    assert borrowed == []
+    assert failed == [book_ids[1].value]
+    assert await stored_loans(book_ids) == {
+        book_ids[0].value: ("available", None),
+        book_ids[1].value: ("borrowed", holder.value),
+        book_ids[2].value: ("available", None),
+    }
+
+
+async def test_batch_borrow_with_an_unknown_book_changes_nothing() -> None:
+    book_ids = await add_books(2)
+    [user] = await add_users(1)
+
+    borrowed, failed = await borrow_all([book_ids[0].value, "unknown", book_ids[1].value], user)
+
+    assert borrowed == []
+    assert failed == ["unknown"]
+    assert await stored_loans(book_ids) == {book_id.value: ("available", None) for book_id in book_ids}
+
+
+async def test_batch_return_by_another_user_changes_nothing() -> None:
+    book_ids = await add_books(2)
+    borrower, other = await add_users(2)
+    await borrow_all([book_ids[0].value], borrower)
+    await borrow_all([book_ids[1].value], other)
+
+    returned, failed = await return_all([book_id.value for book_id in book_ids], borrower)
+
+    assert returned == []
+    assert failed == [book_ids[1].value]
+    assert await stored_loans(book_ids) == {
+        book_ids[0].value: ("borrowed", borrower.value),
+        book_ids[1].value: ("borrowed", other.value),
+    }
+
+
+async def test_overlapping_batches_lend_each_book_once() -> None:
+    book_ids = await add_books(3)
+    users = await add_users(5)
+    # Every batch wants the shared first book
+    batches = [[book_ids[0].value, book_ids[1 + number % 2].value] for number in range(len(users))]
+
+    results = await asyncio.gather(*(borrow_all(batch, user) for batch, user in zip(batches, users, strict=True)))
+
+    winners = [user for (borrowed, _), user in zip(results, users, strict=True) if borrowed]
+    assert len(winners) == 1
+    loans = await stored_loans(book_ids)
+    assert loans[book_ids[0].value] == ("borrowed", winners[0].value)
+    assert sum(loan == ("borrowed", winners[0].value) for loan in loans.values()) == 2
+    assert sum(loan == ("available", None) for loan in loans.values()) == 1
+
+
+async def test_batch_borrow_evicts_cached_books_on_commit_only() -> None:
+    book_ids = await add_books(2)
+    holder, user = await add_users(2)
+    cache: TTLCache[str, Book] = TTLCache(10, 60)
+    assert await cached_statuses(cache, book_ids) == [BookStatus.AVAILABLE, BookStatus.AVAILABLE]
+
+    await borrow_all([book_ids[1].value], holder, cache)
+    assert await cached_statuses(cache, book_ids) == [BookStatus.AVAILABLE, BookStatus.BORROWED]
+
+    # The failed batch is rolled back, so the cached copies still match the database
+    _, failed = await borrow_all([book_id.value for book_id in book_ids], user, cache)
+    assert failed == [book_ids[1].value]
+    assert await cached_statuses(cache, book_ids) == [BookStatus.AVAILABLE, BookStatus.BORROWED]
+    assert await stored_loans(book_ids) == {
+        book_ids[0].value: ("available", None),
+        book_ids[1].value: ("borrowed", holder.value),
+    }
+
+    await return_all([book_ids[1].value], holder, cache)
+    _, failed = await borrow_all([book_id.value for book_id in book_ids], user, cache)
+    assert failed == []
+    assert await cached_statuses(cache, book_ids) == [BookStatus.BORROWED, BookStatus.BORROWED]
@@ -0,0 +1,30 @@
+import pytest
+
+from app.domain.models.book import (
+    Author,
+    Book,
+    Category,
+    Id as BookId,
+    Title,
+)
+from app.domain.services.book import BookFilter
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal
+from app.infrastructures.database.database import BookQueryService, BookRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def uncategorized_book() -> Book:
+    return Book(id=BookId.generate(), title=Title(value="Book"), author=Author(value="Author"), category=[])
+
+
+async def test_books_without_categories_are_filed_under_other() -> None:
+    async with AsyncSessionLocal() as session:
+        repository = BookRepository(session)
+        await repository.save(uncategorized_book())
+        await repository.insert_new([uncategorized_book()])
+
+    async with ReadSessionLocal() as session:
+        queries = BookQueryService(session)
+        assert await queries.count_by_category(BookFilter()) == {Category.OTHER.value: 2}
+        assert len(await queries.find_page(0, 10, BookFilter(category=Category.OTHER))) == 2
@@ -0,0 +1,88 @@
+import base64
+
+from conftest import add_books
+import httpx
+import pytest
+
+from app.domain.services.book import BookRow
+from app.usecase.book import _decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+def book_row(title: str, book_id: str) -> BookRow:
+    return BookRow(
+        title=title,
+        author="Author",
+        description=None,
+        category="Python",
+        id=book_id,
+        status="available",
+        borrowed_by_id=None,
+    )
+
+
+def encoded(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("title", ["Book", "", 'Quotes " and , commas', "Ünïcode 本", "a" * 500])
+async def test_cursors_round_trip(title: str) -> None:
+    cursor = encode_cursor(book_row(title, "id-1"))
+
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (title, "id-1")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!!",
+        "a",
+        encoded(b"\xff\xfe"),
+        encoded(b"not json"),
+        encoded(b"{}"),
+        encoded(b'["title"]'),
+        encoded(b'["title", 1]'),
+        encoded(b'["title", "id", "extra"]'),
+    ],
+)
+async def test_invalid_cursors_are_rejected(cursor: str) -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor)
+
+
+async def test_keyset_pages_list_every_book_once(client: httpx.AsyncClient) -> None:
+    # Four books are titled "Book 0", so pages end between books of the same title, ordered by id
+    book_ids = [book_id for _ in range(3) for book_id in await add_books(1)] + await add_books(2)
+    seen: list[tuple[str, str]] = []
+
+    response = await client.get("/api/books", params={"limit": 2})
+    while True:
+        body = response.json()
+        seen.extend((book["title"], book["id"]) for book in body["items"])
+        if body["next_cursor"] is None:
+            break
+        response = await client.get("/api/books", params={"limit": 2, "cursor": body["next_cursor"]})
+
+    assert seen == sorted(seen)
+    assert sorted(book_id for _, book_id in seen) == sorted(book_id.value for book_id in book_ids)
+
+
+async def test_offset_pages_continue_by_cursor(client: httpx.AsyncClient) -> None:
+    await add_books(5)
+
+    offset_pages = [(await client.get("/api/books", params={"page": page, "limit": 2})).json() for page in (1, 2, 3)]
+    after_first = (
+        await client.get("/api/books", params={"limit": 2, "cursor": offset_pages[0]["next_cursor"]})
+    ).json()
+
+    assert after_first["items"] == offset_pages[1]["items"]
+    assert offset_pages[2]["next_cursor"] is None
+
+
+async def test_invalid_cursor_is_a_bad_request(client: httpx.AsyncClient) -> None:
+    response = await client.get("/api/books", params={"cursor": encoded(b"{}")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
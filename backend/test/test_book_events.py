@@ -0,0 +1,64 @@
+from prometheus_client import REGISTRY
+import pytest
+
+from app.domain.models.book import Id as BookId
+from app.domain.services.book import BookEvent, BookEventType
+from app.infrastructures.events import BookEventBroker
+from app.presentation.event_feed import BookEventFeed
+
+pytestmark = pytest.mark.anyio
+
+
+def deleted(count: int) -> list[BookEvent]:
+    return [BookEvent(type=BookEventType.DELETED, book_id=BookId.generate()) for _ in range(count)]
+
+
+def dropped_subscribers() -> float:
+    return REGISTRY.get_sample_value("book_event_subscribers_dropped_total") or 0.0
+
+
+async def test_subscribers_receive_events_in_order() -> None:
+    broker = BookEventBroker(2)
+    events = deleted(4)
+
+    with broker.subscribe() as subscription:
+        for event in events:
+            broker.publish(event)
+            assert await subscription.get() == event
+
+    assert subscription.closed
+    assert broker.subscriptions == set()
+
+
+async def test_subscribers_that_fall_behind_are_dropped() -> None:
+    broker = BookEventBroker(2)
+    dropped = dropped_subscribers()
+    events = deleted(3)
+
+    with broker.subscribe() as slow, broker.subscribe() as fast:
+        for event in events:
+            broker.publish(event)
+            assert await fast.get() == event
+
+        # The third event found the slow queue full: its buffered events are discarded too
+        assert slow.closed
+        assert await slow.get() is None
+        assert broker.subscriptions == {fast}
+        assert dropped_subscribers() == dropped + 1
+        assert REGISTRY.get_sample_value("book_event_subscribers") == 1
+
+    assert dropped_subscribers() == dropped + 1
+
+
+async def test_feeds_of_dropped_subscribers_end() -> None:
+    broker = BookEventBroker(1)
+    stream = BookEventFeed(broker, heartbeat_seconds=10).stream()
+
+    assert (await anext(stream)).startswith(b"retry: ")
+    for event in deleted(2):
+        broker.publish(event)
+
+    # The buffered event is not sent, so the client reconnects and reloads rather than skipping one
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert broker.subscriptions == set()
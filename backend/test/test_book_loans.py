@@ -0,0 +1,114 @@
+import asyncio
+
+from conftest import add_books, add_users, stored_loans
+import pytest
+
+from app.domain.models.book import (
+    Book,
+    BookStatus,
+    Id as BookId,
+)
+from app.domain.models.user import Id as UserId
+from app.infrastructures.cache import CachedBookRepository, TTLCache
+from app.infrastructures.database.connection import AsyncSessionLocal
+from app.infrastructures.database.database import BookRepository
+from app.infrastructures.events import BookEventBroker
+from app.usecase.book import BookUseCase
+
+pytestmark = pytest.mark.anyio
+
+
+async def borrow(book_id: BookId, user_id: UserId) -> Book | None:
+    # One session per call, closed afterwards like the session of a request
+    async with AsyncSessionLocal() as session:
+        return await BookUseCase(BookRepository(session), BookEventBroker(100)).borrow_book(
+            book_id.value, user_id.value
+        )
+
+
+async def return_(book_id: BookId, borrower_id: UserId | None = None) -> Book | None:
+    async with AsyncSessionLocal() as session:
+        return await BookUseCase(BookRepository(session), BookEventBroker(100)).return_book(
+            book_id.value, borrower_id.value if borrower_id else None
+        )
+
+
+async def test_concurrent_borrows_lend_the_book_once() -> None:
+    [book_id] = await add_books(1)
+    user_ids = await add_users(10)
+
+    results = await asyncio.gather(*(borrow(book_id, user) for user in user_ids))
+
+    winners = [(book, user) for book, user in zip(results, user_ids, strict=True) if book is not None]
+    assert len(winners) == 1
+    assert await stored_loans([book_id]) == {book_id.value: ("borrowed", winners[0][1].value)}
+
+
+async def test_borrowing_a_borrowed_book_fails() -> None:
+    [book_id] = await add_books(1)
+    first, second = await add_users(2)
+
+    assert await borrow(book_id, first) is not None
+    assert await borrow(book_id, second) is None
+    assert await stored_loans([book_id]) == {book_id.value: ("borrowed", first.value)}
+
+
+async def test_only_the_borrower_can_return_the_book() -> None:
+    [book_id] = await add_books(1)
+    borrower, other = await add_users(2)
+    await borrow(book_id, borrower)
+
+    assert await return_(book_id, other) is None
+    assert await stored_loans([book_id]) == {book_id.value: ("borrowed", borrower.value)}
+
+    returned = await return_(book_id, borrower)
+    assert returned is not None
+    assert await stored_loans([book_id]) == {book_id.value: ("available", None)}
+
+
+async def test_concurrent_returns_release_the_book_once() -> None:
+    [book_id] = await add_books(1)
+    [borrower] = await add_users(1)
+    await borrow(book_id, borrower)
+
+    results = await asyncio.gather(*(return_(book_id) for _ in range(5)))
+
+    assert sum(book is not None for book in results) == 1
+    assert await stored_loans([book_id]) == {book_id.value: ("available", None)}
+
+
+async def test_updating_a_book_keeps_a_loan_made_meanwhile() -> None:
+    [book_id] = await add_books(1)
+    [borrower] = await add_users(1)
+    cache: TTLCache[str, Book] = TTLCache(10, 60)
+    broker = BookEventBroker(100)
+    with broker.subscribe() as events:
+        async with AsyncSessionLocal() as session:
+            # The admin's copy of the book is cached before the borrow lands
+            await CachedBookRepository(BookRepository(session), cache).find_by_id(book_id)
+        await borrow(book_id, borrower)
+
+        async with AsyncSessionLocal() as session:
+            usecase = BookUseCase(CachedBookRepository(BookRepository(session), cache), broker)
+            updated = await usecase.update_book(book_id.value, title="New title")
+
+        assert await stored_loans([book_id]) == {book_id.value: ("borrowed", borrower.value)}
+        assert updated is not None
+        assert updated.status == BookStatus.BORROWED
+        event = await events.get()
+        assert event is not None
+        assert event.book == updated
+
+
+async def test_saving_a_book_does_not_write_its_loan() -> None:
+    [book_id] = await add_books(1)
+    [user] = await add_users(1)
+    async with AsyncSessionLocal() as session:
+        repository = BookRepository(session)
+        book = await repository.find_by_id(book_id)
+        assert book is not None
+        book.status = BookStatus.BORROWED
+        book.borrowed_by = user
+        await repository.save(book)
+
+    assert await stored_loans([book_id]) == {book_id.value: ("available", None)}
@@ -0,0 +1,109 @@
+from conftest import add_books
+import pytest
+
+from app.domain.models.book import (
+    Author,
+    Book,
+    Category,
+    Description,
+    Id as BookId,
+    Title,
+)
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal
+from app.infrastructures.database.database import BookQueryService, BookRepository
+from app.infrastructures.database.unit_of_work import UnitOfWork
+
+pytestmark = pytest.mark.anyio
+
+
+def new_book(title: str, author: str = "Author", description: str | None = None) -> Book:
+    return Book(
+        id=BookId.generate(),
+        title=Title(value=title),
+        author=Author(value=author),
+        description=Description(value=description) if description else None,
+        category=[Category.PYTHON],
+    )
+
+
+async def search(query: str) -> list[str]:
+    """Ids of the books matching `query`, best match first; checks the count agrees."""
+    async with ReadSessionLocal() as session:
+        queries = BookQueryService(session)
+        ids = [book["id"] for book in await queries.search(query, offset=0, limit=100)]
+        assert await queries.count_search(query) == len(ids)
+    return ids
+
+
+async def test_saved_books_are_searchable_by_every_indexed_column() -> None:
+    book = new_book("Fluent Python", author="Ramalho", description="Idiomatic café recipes")
+    async with AsyncSessionLocal() as session:
+        await BookRepository(session).save(book)
+
+    for query in ("fluent", "Pyth", "ramalho", "idiomatic", "cafe", "fluent python", "python, fluent!"):
+        assert await search(query) == [book.id.value], query
+    assert await search("fluent java") == []
+
+
+async def test_updates_replace_the_indexed_text() -> None:
+    [book_id] = await add_books(1)
+    async with AsyncSessionLocal() as session:
+        repository = BookRepository(session)
+        book = await repository.find_by_id(book_id)
+        assert book is not None
+        book.title = Title(value="Renamed")
+        await repository.save(book)
+
+    assert await search("renamed") == [book_id.value]
+    assert await search("Book") == []
+
+
+async def test_deleted_books_are_unindexed() -> None:
+    kept, deleted = await add_books(2)
+    async with AsyncSessionLocal() as session:
+        await BookRepository(session).delete(deleted)
+
+    assert await search("Book") == [kept.value]
+
+
+async def test_unit_of_work_writes_are_indexed_on_commit_only() -> None:
+    [deleted] = await add_books(1)
+    committed, rolled_back = new_book("Committed"), new_book("Rolled back")
+
+    async with AsyncSessionLocal() as session, UnitOfWork(session) as uow:
+        await uow.books.save(rolled_back)
+    async with AsyncSessionLocal() as session, UnitOfWork(session) as uow:
+        await uow.books.save(committed)
+        await uow.books.delete(deleted)
+        await uow.commit()
+
+    assert await search("committed") == [committed.id.value]
+    assert await search("rolled") == []
+    assert await search("Book") == []
+
+
+async def test_imported_books_are_indexed() -> None:
+    book = new_book("Imported")
+    async with AsyncSessionLocal() as session:
+        await BookRepository(session).insert_new([book])
+
+    assert await search("imported") == [book.id.value]
+
+
+async def test_title_matches_rank_before_description_matches() -> None:
+    in_description = new_book("Other", description="A book about databases")
+    in_title = new_book("Databases")
+    async with AsyncSessionLocal() as session:
+        repository = BookRepository(session)
+        await repository.save(in_description)
+        await repository.save(in_title)
+
+    assert await search("databases") == [in_title.id.value, in_description.id.value]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "!?", '"', "AND", "title:x", "NEAR(x y)", "x*", "-x"])
+async def test_queries_with_fts_syntax_are_taken_literally(query: str) -> None:
+    await add_books(1)
+
+    # Neither raises a syntax error nor matches anything
+    assert await search(query) == []
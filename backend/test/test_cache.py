@@ -0,0 +1,124 @@
+import asyncio
+
+from conftest import add_books, add_users
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.book import (
+    Book,
+    Id as BookId,
+    Title,
+)
+from app.domain.models.user import (
+    Id as UserId,
+    Name,
+    User,
+)
+from app.infrastructures.cache import CachedBookRepository, CachedUserRepository, TTLCache
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal
+from app.infrastructures.database.database import BookRepository, UserRepository
+
+pytestmark = pytest.mark.anyio
+
+
+class PausedBookRepository(BookRepository):
+    """Holds every loaded book until `resume` is set, as if the reader was descheduled after its SELECT."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session)
+        self.loaded = asyncio.Event()
+        self.resume = asyncio.Event()
+
+    async def find_by_id(self, book_id: BookId) -> Book | None:
+        book = await super().find_by_id(book_id)
+        self.loaded.set()
+        await self.resume.wait()
+        return book
+
+
+class PausedUserRepository(UserRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session)
+        self.loaded = asyncio.Event()
+        self.resume = asyncio.Event()
+
+    async def find_by_id(self, user_id: UserId) -> User | None:
+        user = await super().find_by_id(user_id)
+        self.loaded.set()
+        await self.resume.wait()
+        return user
+
+
+async def test_read_racing_a_book_write_does_not_cache_the_old_book() -> None:
+    [book_id] = await add_books(1)
+    cache: TTLCache[str, Book] = TTLCache(10, 60)
+
+    async with ReadSessionLocal() as read_session, AsyncSessionLocal() as write_session:
+        paused = PausedBookRepository(read_session)
+        read = asyncio.create_task(CachedBookRepository(paused, cache).find_by_id(book_id))
+        await paused.loaded.wait()
+
+        writer = CachedBookRepository(BookRepository(write_session), cache)
+        book = await writer.find_by_id(book_id)
+        assert book is not None
+        book.title = Title(value="New title")
+        await writer.save(book)
+
+        paused.resume.set()
+        old = await read
+
+        assert old is not None
+        assert old.title.value == "Book 0"
+        assert cache.get(book_id.value) is None
+        stored = await writer.find_by_id(book_id)
+        assert stored is not None
+        assert stored.title.value == "New title"
+        assert await writer.find_version(book_id) == stored.version
+
+
+async def test_read_racing_a_user_write_does_not_cache_the_old_user() -> None:
+    [user_id] = await add_users(1)
+    cache: TTLCache[str, User] = TTLCache(10, 60)
+
+    async with ReadSessionLocal() as read_session, AsyncSessionLocal() as write_session:
+        paused = PausedUserRepository(read_session)
+        read = asyncio.create_task(CachedUserRepository(paused, cache).find_by_id(user_id))
+        await paused.loaded.wait()
+
+        writer = CachedUserRepository(UserRepository(write_session), cache)
+        user = await writer.find_by_id(user_id)
+        assert user is not None
+        user.name = Name(value="New name")
+        await writer.save(user)
+
+        paused.resume.set()
+        await read
+
+        assert cache.get(user_id.value) is None
+        stored = await writer.find_by_id(user_id)
+        assert stored is not None
+        assert stored.name.value == "New name"
+
+
+async def test_loads_that_start_after_an_invalidation_are_cached() -> None:
+    cache: TTLCache[str, str] = TTLCache(10, 60)
+    started = asyncio.Event()
+    resume = asyncio.Event()
+
+    async def slow_load() -> str:
+        started.set()
+        await resume.wait()
+        return "old"
+
+    async def fast_load() -> str:
+        return "new"
+
+    slow = asyncio.create_task(cache.get_or_load("key", slow_load))
+    await started.wait()
+    cache.invalidate("key")
+    assert await cache.get_or_load("key", fast_load) == "new"
+    resume.set()
+
+    assert await slow == "old"
+    # The load started before the invalidation did not overwrite the newer value
+    assert cache.get("key") == "new"
@@ -0,0 +1,57 @@
+import io
+
+from conftest import add_books, add_users, stored_loans
+import pytest
+from test_book_loans import borrow
+
+from app.infrastructures.catalog_io import CatalogFormat, format_header, format_records, read_records
+from app.infrastructures.database.connection import AsyncSessionLocal
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.usecase.catalog import CatalogUseCase, ImportReport
+
+pytestmark = pytest.mark.anyio
+
+
+async def export(file_format: CatalogFormat) -> str:
+    async with AsyncSessionLocal() as session:
+        batches = CatalogUseCase(UnitOfWork(session)).export_books()
+        return format_header(file_format) + "".join([format_records(batch, file_format) async for batch in batches])
+
+
+async def import_(content: str, file_format: CatalogFormat) -> ImportReport:
+    async with AsyncSessionLocal() as session:
+        return await CatalogUseCase(UnitOfWork(session)).import_books(read_records(io.StringIO(content), file_format))
+
+
+@pytest.mark.parametrize("file_format", list(CatalogFormat))
+async def test_reimporting_an_export_keeps_loans(file_format: CatalogFormat) -> None:
+    borrowed, available = await add_books(2)
+    [borrower] = await add_users(1)
+    await borrow(borrowed, borrower)
+
+    report = await import_(await export(file_format), file_format)
+
+    assert report.imported == 0
+    assert report.failed == 2
+    assert sorted(error.message for error in report.errors) == sorted(
+        f"Book already exists: {book_id.value}" for book_id in (borrowed, available)
+    )
+    assert await stored_loans([borrowed, available]) == {
+        borrowed.value: ("borrowed", borrower.value),
+        available.value: ("available", None),
+    }
+
+
+async def test_import_reports_ids_repeated_in_the_file() -> None:
+    content = (
+        '{"id": "00000000-0000-4000-8000-000000000001", "title": "First", "author": "Author"}\n'
+        '{"id": "00000000-0000-4000-8000-000000000001", "title": "Second", "author": "Author"}\n'
+        '{"title": "Third", "author": "Author"}\n'
+    )
+
+    report = await import_(content, CatalogFormat.JSONL)
+
+    assert report.imported == 2
+    assert [(error.line, error.message) for error in report.errors] == [
+        (2, "Book already exists: 00000000-0000-4000-8000-000000000001")
+    ]
@@ -0,0 +1,160 @@
+from conftest import add_books, add_users, auth_headers
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.domain.models.book import (
+    Author,
+    Book,
+    Category,
+    Id as BookId,
+    Title,
+)
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal
+from app.infrastructures.database.database import BookQueryService, BookRepository
+from app.infrastructures.database.unit_of_work import UnitOfWork
+from app.presentation.etag import is_not_modified, make_etag
+
+pytestmark = pytest.mark.anyio
+
+
+def request_with(if_none_match: str | None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+async def catalog_version() -> int:
+    async with ReadSessionLocal() as session:
+        return await BookQueryService(session).catalog_version()
+
+
+async def stored_version(book_id: BookId) -> int | None:
+    async with ReadSessionLocal() as session:
+        return await BookRepository(session).find_version(book_id)
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        (None, False),
+        ("", False),
+        ('"7"', True),
+        ('W/"7"', True),
+        ('"6", "7"', True),
+        (' "6" ,W/"7" ', True),
+        ('"6"', False),
+        ('"77"', False),
+        ("7", False),
+        ("*", True),
+    ],
+)
+async def test_is_not_modified(if_none_match: str | None, expected: bool) -> None:
+    assert is_not_modified(request_with(if_none_match), make_etag(7)) is expected
+
+
+async def test_every_write_bumps_the_catalog_version() -> None:
+    book_id, other_id = await add_books(2)
+    [user] = await add_users(1)
+    versions = [await catalog_version()]
+
+    async with AsyncSessionLocal() as session:
+        repository = BookRepository(session)
+        book = await repository.find_by_id(book_id)
+        assert book is not None
+        book.title = Title(value="New title")
+        await repository.save(book)
+        versions.append(await catalog_version())
+        assert await repository.mark_borrowed(book_id, user) is not None
+        versions.append(await catalog_version())
+        assert await repository.mark_returned(book_id, user) is not None
+        versions.append(await catalog_version())
+        assert await repository.mark_many_borrowed([book_id, other_id], user)
+        versions.append(await catalog_version())
+        assert await repository.mark_many_returned([book_id, other_id], user)
+        versions.append(await catalog_version())
+        new_book = Book(id=BookId.generate(), title=Title(value="New"), author=Author(value="A"), category=[])
+        assert await repository.insert_new([new_book]) == [new_book.id]
+        versions.append(await catalog_version())
+        # A book takes the catalog version of its last write
+        assert await stored_version(book_id) == versions[-2]
+        assert await stored_version(new_book.id) == versions[-1]
+        await repository.delete(other_id)
+        versions.append(await catalog_version())
+
+    assert versions == sorted(set(versions))
+
+
+async def test_failed_writes_keep_the_catalog_version() -> None:
+    book_id, other_id = await add_books(2)
+    holder, user = await add_users(2)
+    async with AsyncSessionLocal() as session:
+        await BookRepository(session).mark_borrowed(book_id, holder)
+    version = await catalog_version()
+
+    # Each failed compare-and-set is rolled back when its session is closed
+    async with AsyncSessionLocal() as session:
+        assert await BookRepository(session).mark_borrowed(book_id, user) is None
+    async with AsyncSessionLocal() as session:
+        assert await BookRepository(session).mark_returned(book_id, user) is None
+    async with AsyncSessionLocal() as session:
+        assert await BookRepository(session).mark_returned(other_id) is None
+    # A unit of work that is not committed rolls back the books it did update
+    async with AsyncSessionLocal() as session, UnitOfWork(session) as uow:
+        assert len(await uow.books.mark_many_borrowed([book_id, other_id], user)) == 1
+
+    assert await catalog_version() == version
+    assert await stored_version(book_id) == version
+
+
+async def test_book_detail_is_revalidated_by_version(client: httpx.AsyncClient) -> None:
+    [book_id] = await add_books(1)
+    [user] = await add_users(1)
+    url = f"/api/books/{book_id.value}"
+
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+    assert etag == make_etag(await stored_version(book_id) or 0)
+
+    not_modified = await client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+    assert (await client.get(url, headers={"If-None-Match": f"W/{etag}"})).status_code == 304
+
+    borrowed = await client.post(f"{url}/borrow", json={"user_id": user.value}, headers=auth_headers(user))
+    assert borrowed.status_code == 200
+
+    modified = await client.get(url, headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+    assert modified.json()["status"] == "borrowed"
+
+
+async def test_unknown_book_is_not_revalidated(client: httpx.AsyncClient) -> None:
+    response = await client.get("/api/books/unknown", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "url", ["/api/books", "/api/books?category=Python", "/api/books/search?q=Book", "/api/books/facets"]
+)
+async def test_listings_are_revalidated_by_catalog_version(client: httpx.AsyncClient, url: str) -> None:
+    [book_id] = await add_books(1)
+    [admin] = await add_users(1)
+
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+    assert etag == make_etag(await catalog_version())
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    updated = await client.put(
+        f"/api/books/{book_id.value}",
+        json={"category": Category.DEEP_LEARNING.value},
+        headers=auth_headers(admin, is_admin=True),
+    )
+    assert updated.status_code == 200
+
+    modified = await client.get(url, headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] == make_etag(await catalog_version())
+    assert modified.content != response.content
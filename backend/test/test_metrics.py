@@ -0,0 +1,33 @@
+from conftest import add_books, add_users
+from prometheus_client import REGISTRY
+import pytest
+
+from app.domain.models.book import Id as BookId
+from app.domain.models.user import Id as UserId
+from app.infrastructures.database.connection import AsyncSessionLocal
+from app.infrastructures.database.unit_of_work import UnitOfWork
+
+pytestmark = pytest.mark.anyio
+
+
+def repository_calls(repository: str, method: str) -> float:
+    labels = {"repository": repository, "method": method}
+    return REGISTRY.get_sample_value("repository_call_duration_seconds_count", labels) or 0.0
+
+
+async def test_unit_of_work_calls_are_timed() -> None:
+    [book_id] = await add_books(1)
+    [user_id] = await add_users(1)
+    borrowed = repository_calls("book", "mark_many_borrowed")
+    returned = repository_calls("book", "mark_many_returned")
+    found = repository_calls("user", "find_by_id")
+
+    async with AsyncSessionLocal() as session, UnitOfWork(session) as uow:
+        await uow.books.mark_many_borrowed([book_id], user_id)
+        await uow.books.mark_many_returned([book_id], user_id)
+        await uow.users.find_by_id(user_id)
+        await uow.books.mark_many_borrowed([BookId(value="unknown")], UserId.generate())
+
+    assert repository_calls("book", "mark_many_borrowed") == borrowed + 2
+    assert repository_calls("book", "mark_many_returned") == returned + 1
+    assert repository_calls("user", "find_by_id") == found + 1
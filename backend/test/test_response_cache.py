@@ -0,0 +1,87 @@
+from conftest import add_books, add_users, auth_headers
+import httpx
+from prometheus_client import REGISTRY
+import pytest
+
+from app.presentation.response_cache import ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+class Renderer:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> dict[str, int]:
+        self.calls += 1
+        return {"call": self.calls}
+
+
+def lookups(endpoint: str, result: str) -> float:
+    labels = {"endpoint": endpoint, "result": result}
+    return REGISTRY.get_sample_value("response_cache_lookups_total", labels) or 0.0
+
+
+async def test_bodies_are_rendered_once_per_version_and_params() -> None:
+    cache = ResponseCache(10)
+    render = Renderer()
+
+    first = await cache.get_or_render("list", 1, (1, 10), render)
+    assert await cache.get_or_render("list", 1, (1, 10), render) == first
+    assert render.calls == 1
+
+    assert await cache.get_or_render("list", 1, (2, 10), render) != first
+    assert await cache.get_or_render("search", 1, (1, 10), render) != first
+    assert await cache.get_or_render("list", 2, (1, 10), render) != first
+    assert render.calls == 4
+
+
+async def test_failed_renders_are_not_cached() -> None:
+    cache = ResponseCache(10)
+
+    async def fail() -> dict[str, int]:
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await cache.get_or_render("list", 1, (), fail)
+    assert await cache.get_or_render("list", 1, (), Renderer()) == b'{"call":1}'
+
+
+async def test_a_zero_size_cache_renders_every_time() -> None:
+    cache = ResponseCache(0)
+    render = Renderer()
+
+    await cache.get_or_render("list", 1, (), render)
+    await cache.get_or_render("list", 1, (), render)
+
+    assert render.calls == 2
+    assert len(cache.cache) == 0
+
+
+async def test_listings_are_served_from_cache_until_a_write(client: httpx.AsyncClient) -> None:
+    [book_id] = await add_books(1)
+    [admin] = await add_users(1)
+    hits = lookups("list", "hit")
+
+    first = await client.get("/api/books")
+    assert (await client.get("/api/books")).content == first.content
+    assert lookups("list", "hit") == hits + 1
+
+    await client.put(
+        f"/api/books/{book_id.value}", json={"title": "Renamed"}, headers=auth_headers(admin, is_admin=True)
+    )
+
+    renamed = await client.get("/api/books")
+    assert lookups("list", "hit") == hits + 1
+    assert renamed.json()["items"][0]["title"] == "Renamed"
+
+
+async def test_searches_differing_in_spacing_share_an_entry(client: httpx.AsyncClient) -> None:
+    await add_books(1)
+    hits = lookups("search", "hit")
+
+    first = await client.get("/api/books/search", params={"q": "Book 0"})
+    second = await client.get("/api/books/search", params={"q": "  Book   0 "})
+
+    assert second.content == first.content
+    assert lookups("search", "hit") == hits + 1
@@ -0,0 +1,79 @@
+from conftest import add_users
+import pytest
+from sqlalchemy import AsyncAdaptedQueuePool
+
+from app.domain.models.user import Email
+from app.infrastructures.database.connection import AsyncSessionLocal, ReadSessionLocal, async_engine
+from app.infrastructures.database.database import BookRepository, UserRepository
+from app.infrastructures.password import PasswordHasher
+from app.usecase.user import UserUseCase
+
+pytestmark = pytest.mark.anyio
+
+
+def writers_in_use() -> int:
+    pool = async_engine.pool
+    assert isinstance(pool, AsyncAdaptedQueuePool)
+    return pool.checkedout()
+
+
+class WriterCheckingHasher(PasswordHasher):
+    """Records how many writer connections are checked out whenever a password is hashed or verified."""
+
+    def __init__(self) -> None:
+        super().__init__(time_cost=1, memory_cost=8, max_workers=1)
+        self.writers_in_use: list[int] = []
+
+    async def hash(self, password: str) -> str:
+        self.writers_in_use.append(writers_in_use())
+        return await super().hash(password)
+
+    async def verify(self, password: str, password_hash: str | None) -> tuple[bool, str | None]:
+        self.writers_in_use.append(writers_in_use())
+        return await super().verify(password, password_hash)
+
+
+async def test_login_does_not_hold_the_writer_while_verifying() -> None:
+    await add_users(1)
+    hasher = WriterCheckingHasher()
+
+    # Sessions as given to a POST request
+    async with AsyncSessionLocal() as db, ReadSessionLocal() as read_db:
+        usecase = UserUseCase(UserRepository(db), BookRepository(db), hasher, UserRepository(read_db))
+        user = await usecase.authenticate_user("user0@example.com", "hash")
+
+    assert user is not None
+    assert hasher.writers_in_use == [0]
+    # The plaintext password was still replaced by a hash
+    async with ReadSessionLocal() as db:
+        stored = await UserRepository(db).find_by_email(Email(value="user0@example.com"))
+    assert stored is not None
+    assert stored.password.value.startswith("$argon2")
+
+
+async def test_register_does_not_hold_the_writer_while_hashing() -> None:
+    hasher = WriterCheckingHasher()
+
+    async with AsyncSessionLocal() as db, ReadSessionLocal() as read_db:
+        usecase = UserUseCase(UserRepository(db), BookRepository(db), hasher, UserRepository(read_db))
+        await usecase.create_user("New", "new@example.com", "secret")
+        with pytest.raises(ValueError, match="already exists"):
+            await usecase.create_user("Other", "new@example.com", "secret")
+
+    assert hasher.writers_in_use == [0, 0]
+
+
+async def test_update_does_not_hold_the_writer_while_hashing() -> None:
+    [user_id] = await add_users(1)
+    hasher = WriterCheckingHasher()
+
+    async with AsyncSessionLocal() as db, ReadSessionLocal() as read_db:
+        usecase = UserUseCase(UserRepository(db), BookRepository(db), hasher, UserRepository(read_db))
+        updated = await usecase.update_user(user_id.value, password="new")  # noqa: S106
+
+    assert updated is not None
+    assert hasher.writers_in_use == [0]
+    async with ReadSessionLocal() as db:
+        stored = await UserRepository(db).find_by_id(user_id)
+    assert stored is not None
+    assert stored.password.value.startswith("$argon2")
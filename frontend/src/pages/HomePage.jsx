@@ -43,6 +43,15 @@ function HomePage() {
     }
   };
 
+  // Replace a book in the lists shown, or remove it when `book` is null
+  const applyBookChange = (bookId, book) => {
+    const update = (list) => book
+      ? list.map((item) => (item.id === bookId ? book : item))
+      : list.filter((item) => item.id !== bookId);
+    setBooks(update);
+    setFilteredBooks(update);
+  };
+
   // Borrow a book
   const handleBorrowBook = async (bookId) => {
     try {
@@ -62,7 +71,7 @@ function HomePage() {
         throw new Error(errorData.detail || 'Failed to borrow book');
       }
 
-      fetchBooks();
+      applyBookChange(bookId, await response.json());
       return { success: true };
     } catch (error) {
       console.error('Error borrowing book:', error);
@@ -86,7 +95,7 @@ function HomePage() {
         throw new Error(errorData.detail || 'Failed to return book');
       }
 
-      fetchBooks();
+      applyBookChange(bookId, await response.json());
       return { success: true };
     } catch (error) {
       console.error('Error returning book:', error);
@@ -109,7 +118,7 @@ function HomePage() {
         throw new Error(errorData.detail || 'Failed to delete book');
       }
 
-      fetchBooks();
+      applyBookChange(bookId, null);
       return { success: true };
     } catch (error) {
       console.error('Error deleting book:', error);
@@ -158,6 +167,25 @@ function HomePage() {
     fetchBooks();
   }, [token]);
 
+  // Follow changes made by everyone as they are committed, instead of polling the list
+  useEffect(() => {
+    const events = new EventSource(`${API_BASE_URL}/books/events`);
+    let connected = false;
+    events.onopen = () => {
+      // Changes made while reconnecting were missed, so reload once the feed is back
+      if (connected) {
+        fetchBooks();
+      }
+      connected = true;
+    };
+    const handleEvent = (event) => {
+      const { book_id: bookId, book } = JSON.parse(event.data);
+      applyBookChange(bookId, book);
+    };
+    ['borrowed', 'returned', 'updated', 'deleted'].forEach((type) => events.addEventListener(type, handleEvent));
+    return () => events.close();
+  }, [token]);
+
   const handleLogout = () => {
     logout();
   };